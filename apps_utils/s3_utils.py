@@ -4,7 +4,9 @@ import json
 import re
 import tempfile
 from datetime import datetime, timedelta
+from functools import lru_cache
 from io import BytesIO
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 from apps_utils.openai_utils import generate_audio_from_text
 from apps_utils.debug_utils import printLog
@@ -16,16 +18,33 @@ import time
 _audio_index_cache = {}  # klucz: (year, month, lang) -> {"ts": float, "data": dict}
 _audio_index_lock = threading.Lock()
 
+# Pula połączeń HTTPS klienta S3 – równoległe uploady nie czekają na wolne połączenie
+S3_MAX_POOL_CONNECTIONS = 32
+
+@lru_cache(maxsize=8)
+def _s3_client(access_key, secret_key, region_name):
+    # klient boto3 jest thread-safe: jedna sesja i pula keep-alive na proces
+    session = boto3.session.Session()
+    return session.client(
+        's3',
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region_name,
+        config=BotoConfig(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
 def s3_session() -> dict:
     try:
         region_name=os.getenv("S3_REGION")
         bucket = os.getenv("AWS_S3_BUCKET")
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=region_name
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            region_name,
         )
         
     except Exception as e:
@@ -35,12 +54,10 @@ def s3_session() -> dict:
 
 def upload_to_s3(file_path, s3_key):
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
 
@@ -94,12 +111,10 @@ def get_s3_url(s3_key):
 
 def download_from_s3(s3_key, local_path):
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
 
@@ -112,12 +127,10 @@ def download_from_s3(s3_key, local_path):
 def upload_json_to_s3(data: dict, s3_key: str):
     
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
         
@@ -134,12 +147,10 @@ def upload_json_to_s3(data: dict, s3_key: str):
 
 def list_audio_test_files():
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
 
@@ -174,12 +185,10 @@ def list_audio_test_files():
 def get_audio_test_texts():
     
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
 
@@ -221,12 +230,10 @@ def remove_article_from_audio_index(s3_prefix: str, article_yy: str, article_mm:
     Zwraca dict z podsumowaniem.
     """
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
 
@@ -280,12 +287,10 @@ def remove_article_from_audio_index(s3_prefix: str, article_yy: str, article_mm:
 
 def build_and_upload_audio_indexes(new_data_dict, s3_prefix, article_yy, article_mm, lang):
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
     except Exception as e:
@@ -442,12 +447,10 @@ def prune_audio_index_after_deletions(s3_prefix: str, article_yy: str, article_m
     Zwraca dict z podsumowaniem operacji.
     """
     try:
-        session = boto3.session.Session()
-        s3 = session.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("S3_REGION")
+        s3 = _s3_client(
+            os.getenv("AWS_ACCESS_KEY_ID"),
+            os.getenv("AWS_SECRET_ACCESS_KEY"),
+            os.getenv("S3_REGION"),
         )
         bucket = os.getenv("AWS_S3_BUCKET")
         region = os.getenv("S3_REGION") or "eu-west-2"
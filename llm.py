@@ -12,4 +12,12 @@ def ask_model_openai(system_prompt, user_prompt):
         ], 
         temperature=0.5 
     ) 
-    return response.choices[0].message.content.strip()
\ No newline at end of file
+    return response.choices[0].message.content.strip()
+
+
+def embed_text_openai(text, model="text-embedding-3-small"):
+    response = openai.embeddings.create(
+        model=model,
+        input=text,
+    )
+    return response.data[0].embedding
@@ -23,21 +23,19 @@ RED = "\x1b[31;20m"
 BOLD_RED = "\x1b[31;1m"
 RESET = "\x1b[0m"
 
+FORMATS = {
+    logging.DEBUG: GREY + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
+    logging.INFO: GREY + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
+    logging.WARNING: YELLOW + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
+    logging.ERROR: RED + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
+    logging.CRITICAL: BOLD_RED + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET
+}
+
+# Wspólny formatter dla wszystkich loggerów (bezstanowy)
+_DEFAULT_FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
 def setup_logger(logger_name: str, log_file: str, level=logging.INFO) -> logging.Logger:
     print(f'\n\tSTART setup_logger() ==> {logger_name}', end=' ')
-    
-    FORMATS = {
-        logging.DEBUG: GREY + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
-        logging.INFO: GREY + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
-        logging.WARNING: YELLOW + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
-        logging.ERROR: RED + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET,
-        logging.CRITICAL: BOLD_RED + "%(asctime)s - %(name)s - %(levelname)s - %(message)s" + RESET
-    }
-
-    def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
 
     # Konfiguracja loggera    
     logger = logging.getLogger(logger_name)
@@ -56,7 +54,7 @@ def setup_logger(logger_name: str, log_file: str, level=logging.INFO) -> logging
         encoding="utf-8",
         errors="replace",
     )
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    formatter = _DEFAULT_FORMATTER
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
@@ -1,14 +1,26 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 
 BASE_DIR = os.path.dirname(__file__)
 PROJECTS_DIR = os.path.join(BASE_DIR, "projects")
 os.makedirs(PROJECTS_DIR, exist_ok=True)
+# Cache odpowiedzi LLM z promptami (klucz: sha256 promptów systemowego i użytkownika).
+PROMPT_CACHE_DIR = os.path.join(PROJECTS_DIR, "_prompt_cache")
+# Indeks SQLite manifestów (lista projektów bez czytania każdego manifest.json).
+MANIFEST_INDEX_PATH = os.path.join(PROJECTS_DIR, "projects.db")
 
 DEFAULT_IMAGE_SIZE = os.getenv("NEWS_TO_IMAGE_SIZE", "1024x1024")
 DEFAULT_LANGUAGE = os.getenv("NEWS_TO_IMAGE_LANGUAGE", "pl")
 
+# Semantyczny cache promptów (embeddingi artykułów) – domyślnie wyłączony.
+SEMANTIC_CACHE_ENABLED = os.getenv("NEWS_TO_IMAGE_SEMANTIC_CACHE", "0").strip().lower() in ("1", "true", "yes", "on")
+try:
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("NEWS_TO_IMAGE_SEMANTIC_THRESHOLD", "0.92"))
+except ValueError:
+    SEMANTIC_CACHE_THRESHOLD = 0.92
+
 
 @dataclass(frozen=True)
 class ImageProjectPaths:
@@ -16,7 +28,10 @@ class ImageProjectPaths:
     manifest_path: str
 
 
+@lru_cache(maxsize=1024)
 def ensure_project_paths(project_id: str) -> ImageProjectPaths:
+    # Katalogi projektów nie są usuwane w trakcie pracy aplikacji,
+    # więc makedirs wystarczy wykonać raz na project_id.
     project_dir = os.path.join(PROJECTS_DIR, project_id)
     os.makedirs(project_dir, exist_ok=True)
     manifest_path = os.path.join(project_dir, "manifest.json")
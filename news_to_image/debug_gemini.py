@@ -2,10 +2,15 @@ import json
 import logging
 # from logging_config import news_to_images_logger
 import os
+import re
 import sys
 from typing import Iterable
 
 
+# Znaki spoza drukowalnego ASCII (0x20-0x7E) w kluczu API.
+_BAD_KEY_CHARS_RE = re.compile(r"[^\x20-\x7e]")
+
+
 def _setup_logging(level: str = "INFO") -> None:
     logging.basicConfig(
         level=getattr(logging, level.upper(), logging.INFO),
@@ -24,8 +29,7 @@ def _validate_api_key(logger: logging.Logger, api_key: str) -> None:
             "Klucz API zawiera wiodące lub końcowe białe znaki. Rozważ użycie wartości bez spacji/nowych linii."
         )
         api_key = stripped
-    bad_chars = [ch for ch in api_key if ord(ch) < 32 or ord(ch) > 126]
-    if bad_chars:
+    if _BAD_KEY_CHARS_RE.search(api_key):
         logger.warning(
             "Klucz API zawiera nietypowe znaki (np. znak nowej linii)."
         )
@@ -75,12 +79,18 @@ def main() -> int:
         logger.warning("Brak modeli zwróconych przez list_models().")
         return 1
 
+    model_methods = [
+        (
+            model,
+            getattr(model, "generation_methods", None)
+            or getattr(model, "supported_generation_methods", None),
+        )
+        for model in models
+    ]
+
     logger.info("Dostępne modele (%d):", len(models))
-    for model in models:
+    for model, methods in model_methods:
         name = getattr(model, "name", "<unknown>")
-        methods = getattr(model, "generation_methods", None) or getattr(
-            model, "supported_generation_methods", None
-        )
         extra = {
             "available": getattr(model, "available", ""),
             "display_name": getattr(model, "display_name", ""),
@@ -90,10 +100,7 @@ def main() -> int:
         )
 
     # Prosty smoke-test dla pierwszego modelu z generateImages
-    for model in models:
-        methods = getattr(model, "generation_methods", None) or getattr(
-            model, "supported_generation_methods", None
-        )
+    for model, methods in model_methods:
         methods = [str(m).lower() for m in (methods or [])]
         if any("image" in m for m in methods) or "generateimages" in methods:
             target_model = getattr(model, "name", "")
@@ -1,23 +1,350 @@
-import base64
+import binascii
+import hashlib
+import io
+import json
 import os
 import logging
 import inspect
+import shutil
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Sequence
+from functools import lru_cache, partial
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
 
+try:
+    # Opcjonalnie: dekoder base64 z SIMD (libbase64), kilkukrotnie szybszy od binascii.
+    from pybase64 import b64decode as _b64decode_chunk  # type: ignore
+except ImportError:
+    _b64decode_chunk = binascii.a2b_base64
 
-@dataclass
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+
+
+# Limit równoległych zapytań do API obrazów (limity per klucz API).
+MAX_PARALLEL_PROMPTS = 4
+# Globalny limit równoczesnych wywołań API obrazów w procesie (wiele zadań naraz).
+try:
+    _API_MAX_CONCURRENCY = max(1, int(os.getenv("IMAGE_API_MAX_CONCURRENCY", "5")))
+except ValueError:
+    _API_MAX_CONCURRENCY = 5
+_API_SEMAPHORE = threading.BoundedSemaphore(_API_MAX_CONCURRENCY)
+# Wątki zapisujące obrazy na dysk równolegle z kolejnymi wywołaniami API.
+_IO_WORKERS = 2
+# Porcja base64 dekodowana naraz (wielokrotność 4 znaków).
+_B64_CHUNK_CHARS = 64 * 1024
+
+# Bufor kopiowania obrazu pobieranego z URL.
+_COPY_CHUNK = 64 * 1024
+
+# Zapis obrazów bezpośrednio do S3 (bez pliku lokalnego) – wymaga skonfigurowanego bucketu.
+_S3_UPLOAD = os.getenv("NEWS_TO_IMAGE_S3_UPLOAD", "0").strip().lower() in ("1", "true", "yes", "on")
+_S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ImageURL:
+    """Image returned by the provider as a download URL instead of inline data."""
+
+    url: str
+
+
+# Obraz zwrócony przez API: surowe bajty, tekst base64 albo URL do pobrania.
+ImagePayload = Union[bytes, str, ImageURL]
+
+# Klucze odpowiedzi REST Gemini w kolejności priorytetu.
+_REST_LIST_KEYS = ("images", "generatedImages", "responses", "predictions")
+_REST_B64_KEYS = ("b64_json", "bytesBase64", "inlineData")
+_REST_NESTED_B64_KEYS = ("bytesBase64", "b64_json")
+
+# Metody list_models() (małymi literami) pozwalające na generate_content.
+_CONTENT_METHODS = frozenset({"generatecontent", "streamgeneratecontent"})
+
+# Dyskowy cache wyników list_models() – współdzielony między uruchomieniami CLI.
+_MODELS_CACHE_DIR = os.getenv(
+    "GEMINI_MODELS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "moderacja")
+)
+try:
+    _MODELS_CACHE_TTL = float(os.getenv("GEMINI_MODELS_CACHE_TTL", "86400"))
+except ValueError:
+    _MODELS_CACHE_TTL = 86400.0
+
+# Tryb wsadowy Gemini (Batch Mode) – odpytywanie stanu zadania.
+_BATCH_POLL_SECONDS = 10
+_BATCH_FINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class GeneratedImage:
     prompt: str
     filename: str
+    # Ścieżka lokalna albo klucz S3, gdy obraz trafił bezpośrednio do bucketu.
     path: str
+    s3_url: Optional[str] = None
 
 
 class ImageGenerationError(RuntimeError):
     """Raised when image generation fails."""
 
 
+def _first_present(data: Dict, keys: Sequence[str]):
+    """Value of the first key with a truthy value, like a chain of data.get(...) or ..."""
+    return next((data[key] for key in keys if data.get(key)), None)
+
+
+def _store_image(project_dir: str, idx: int, prompt: str, payload: ImagePayload) -> GeneratedImage:
+    filename = f"image_{idx:02d}.png"
+    target = _s3_target()
+    if target is not None:
+        key = f"{target[3]}/news_to_image/{os.path.basename(project_dir)}/{filename}"
+        try:
+            url = _upload_image(target, key, payload)
+            return GeneratedImage(prompt=prompt, filename=filename, path=key, s3_url=url)
+        except Exception as exc:
+            logging.getLogger("news_to_image.s3").warning("S3 upload failed for %s, saving locally: %s", key, exc)
+    path = os.path.join(project_dir, filename)
+    _write_image(path, payload)
+    return GeneratedImage(prompt=prompt, filename=filename, path=path)
+
+
+_S3_TARGET: Optional[Tuple] = None
+_S3_TARGET_LOCK = threading.Lock()
+
+
+def _s3_target() -> Optional[Tuple]:
+    """(client, bucket, base_url, prefix) when images go straight to S3, otherwise None.
+
+    Only a successful lookup is memoized; after a failure the next call tries again.
+    """
+    global _S3_TARGET
+    if not _S3_UPLOAD:
+        return None
+    with _S3_TARGET_LOCK:
+        if _S3_TARGET is None:
+            _S3_TARGET = _resolve_s3_target()
+        return _S3_TARGET
+
+
+def _resolve_s3_target() -> Optional[Tuple]:
+    try:
+        from apps_utils.s3_utils import s3_session
+        from news_to_video.renders_engines.s3_proc import (
+            _s3_env_base_url,
+            _s3_env_bucket,
+            _s3_env_prefix,
+            _s3_ready,
+        )
+
+        if not _s3_ready():
+            logging.getLogger("news_to_image.s3").warning("NEWS_TO_IMAGE_S3_UPLOAD=1, ale bucket S3 nie jest skonfigurowany.")
+            return None
+        s3, default_bucket, region = s3_session()
+        bucket = _s3_env_bucket() or default_bucket
+        return s3, bucket, _s3_env_base_url(bucket, region), _s3_env_prefix()
+    except Exception as exc:
+        logging.getLogger("news_to_image.s3").warning("S3 unavailable for generated images: %s", exc)
+        return None
+
+
+def _upload_image(target: Tuple, key: str, payload: ImagePayload) -> str:
+    """Stream the payload into S3 (multipart for large bodies) and return its public URL."""
+    s3, bucket, base_url, _prefix = target
+    from boto3.s3.transfer import TransferConfig  # type: ignore
+
+    kwargs = {
+        "ExtraArgs": {"ContentType": "image/png", "ACL": "public-read"},
+        "Config": TransferConfig(multipart_threshold=_S3_MULTIPART_THRESHOLD, use_threads=True),
+    }
+    if isinstance(payload, ImageURL):
+        with _get_rest_session().get(payload.url, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            s3.upload_fileobj(resp.raw, bucket, key, **kwargs)
+    else:
+        data = _b64decode_chunk(payload) if isinstance(payload, str) else payload
+        s3.upload_fileobj(io.BytesIO(data), bucket, key, **kwargs)
+    return f"{base_url}/{key}"
+
+
+def _decoded_size(payload: ImagePayload) -> Optional[int]:
+    """Exact size of the image on disk, or None when it cannot be known up front."""
+    if not isinstance(payload, str):
+        return len(payload)
+    if len(payload) % 4 or "\n" in payload or "\r" in payload:
+        return None
+    return len(payload) // 4 * 3 - (len(payload) - len(payload.rstrip("=")))
+
+
+def _write_all(fd: int, data) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+_REST_SESSION = None
+_REST_SESSION_LOCK = threading.Lock()
+
+
+def _get_rest_session():
+    """Process-wide requests.Session with a keep-alive pool sized for the prompt thread pool."""
+    global _REST_SESSION
+    with _REST_SESSION_LOCK:
+        if _REST_SESSION is None:
+            if requests is None:
+                raise ImageGenerationError("Pakiet requests nie jest zainstalowany.")
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=MAX_PARALLEL_PROMPTS * 2,
+                max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+            )
+            session.mount("https://", adapter)
+            _REST_SESSION = session
+        return _REST_SESSION
+
+
+def _download_image(path: str, url: str) -> None:
+    with _get_rest_session().get(url, stream=True, timeout=60) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        with open(path, "wb") as fp:
+            shutil.copyfileobj(resp.raw, fp, length=_COPY_CHUNK)
+
+
+def _write_image(path: str, payload: ImagePayload) -> None:
+    """Store image payload on disk, decoding base64 chunk by chunk instead of in one allocation."""
+    if isinstance(payload, ImageURL):
+        _download_image(path, payload.url)
+        return
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        size = _decoded_size(payload)
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                pass
+        if not isinstance(payload, str):
+            _write_all(fd, payload)
+            return
+        # Base64 z łamaniem linii dekodujemy porcjami, przenosząc niepełne
+        # 4-znakowe grupy do kolejnej porcji – bez kopii całego tekstu.
+        pending = ""
+        for start in range(0, len(payload), _B64_CHUNK_CHARS):
+            chunk = pending + payload[start:start + _B64_CHUNK_CHARS]
+            if "\n" in chunk or "\r" in chunk:
+                chunk = "".join(chunk.split())
+            usable = len(chunk) - len(chunk) % 4
+            pending = chunk[usable:]
+            if usable:
+                _write_all(fd, _b64decode_chunk(chunk[:usable]))
+        if pending:
+            _write_all(fd, _b64decode_chunk(pending))
+    finally:
+        os.close(fd)
+
+
+def _models_cache_path(api_key: str) -> str:
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(_MODELS_CACHE_DIR, f"gemini_models-{key_hash}.json")
+
+
+def _load_models_cache(api_key: str) -> Optional[Tuple[Tuple[str, Tuple[str, ...]], ...]]:
+    path = _models_cache_path(api_key)
+    try:
+        if time.time() - os.path.getmtime(path) > _MODELS_CACHE_TTL:
+            return None
+        with open(path, "r", encoding="utf-8") as fp:
+            entries = json.load(fp)
+        return tuple((str(name), tuple(str(m) for m in methods)) for name, methods in entries)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _save_models_cache(api_key: str, listed: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> None:
+    try:
+        os.makedirs(_MODELS_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=_MODELS_CACHE_DIR, suffix=".tmp", delete=False
+        ) as fp:
+            json.dump([[name, list(methods)] for name, methods in listed], fp)
+        os.replace(fp.name, _models_cache_path(api_key))
+    except OSError as exc:
+        logging.getLogger("news_to_image.gemini").debug("Gemini models cache write failed: %s", exc)
+
+
+_LISTED_MODELS: Dict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]] = {}
+_LISTED_MODELS_LOCK = threading.Lock()
+
+
+def _invalidate_models_cache(api_key: str) -> None:
+    """Drop cached list_models() results for one API key, both in memory and on disk."""
+    with _LISTED_MODELS_LOCK:
+        _LISTED_MODELS.pop(api_key, None)
+    try:
+        os.remove(_models_cache_path(api_key))
+    except OSError:
+        pass
+
+
+def _cached_list_models(api_key: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Process-wide cache of genai.list_models() as (name, methods) pairs, keyed by API key.
+
+    Results are also kept on disk for _MODELS_CACHE_TTL seconds, so short CLI runs skip
+    the network call. genai.configure(api_key=...) must be called before the first lookup.
+    """
+    with _LISTED_MODELS_LOCK:
+        result = _LISTED_MODELS.get(api_key)
+    if result is None:
+        result = _load_models_cache(api_key)
+        if result is None:
+            result = _list_models_remote(api_key)
+        with _LISTED_MODELS_LOCK:
+            _LISTED_MODELS[api_key] = result
+    return result
+
+
+def _list_models_remote(api_key: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """genai.list_models() as (name, methods) pairs, written to the on-disk cache."""
+    import google.generativeai as genai  # type: ignore
+
+    listed: List[Tuple[str, Tuple[str, ...]]] = []
+    for model in genai.list_models():
+        name = getattr(model, "name", "")
+        if not name:
+            continue
+        methods = (
+            getattr(model, "generation_methods", None)
+            or getattr(model, "supported_generation_methods", None)
+            or []
+        )
+        listed.append((name, tuple(str(m) for m in methods)))
+    result = tuple(listed)
+    _save_models_cache(api_key, result)
+    return result
+
+
+@lru_cache(maxsize=64)
+def _cached_sdk_model(factory, api_key: str, model_name: str):
+    """Process-wide cache of SDK model objects (ImageGenerationModel / GenerativeModel)."""
+    return factory(model_name=model_name)
+
+
 class ImageGenerator(ABC):
     name: str
 
@@ -25,44 +352,135 @@ class ImageGenerator(ABC):
     def generate(self, prompts: Sequence[str], project_dir: str) -> List[GeneratedImage]:
         """Generate images for provided prompts and store them within project_dir."""
 
+    def close(self) -> None:
+        """Release network clients held by the generator."""
+
+    def __enter__(self) -> "ImageGenerator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _generate_parallel(
+    fetch: Callable[[int, str], ImagePayload],
+    prompts: Sequence[str],
+    project_dir: str,
+) -> List[GeneratedImage]:
+    """Run fetch(idx, prompt) for every unique prompt in a thread pool, keeping prompt order.
+
+    Files are written on a separate I/O pool, so API workers move on to the next prompt
+    while the previous image is still being flushed to disk. Repeated prompts are sent
+    to the API once and their image file is copied locally.
+    """
+    if not prompts:
+        return []
+    first_idx: Dict[str, int] = {}
+    for idx, prompt in enumerate(prompts, start=1):
+        first_idx.setdefault(prompt, idx)
+    def limited_fetch(idx: int, prompt: str) -> ImagePayload:
+        with _API_SEMAPHORE:
+            return fetch(idx, prompt)
+
+    workers = min(len(first_idx), MAX_PARALLEL_PROMPTS)
+    with ThreadPoolExecutor(max_workers=workers) as api_pool, ThreadPoolExecutor(
+        max_workers=_IO_WORKERS
+    ) as io_pool:
+        fetches = {
+            api_pool.submit(limited_fetch, idx, prompt): (idx, prompt)
+            for prompt, idx in first_idx.items()
+        }
+        writes = {}
+        for future in as_completed(fetches):
+            idx, prompt = fetches[future]
+            writes[idx] = io_pool.submit(_store_image, project_dir, idx, prompt, future.result())
+        stored = {idx: write.result() for idx, write in writes.items()}
+
+    generated: List[GeneratedImage] = []
+    for idx, prompt in enumerate(prompts, start=1):
+        source = stored[first_idx[prompt]]
+        if idx == first_idx[prompt]:
+            generated.append(source)
+            continue
+        if source.s3_url:
+            # obraz w S3 – powtórzony prompt wskazuje ten sam obiekt
+            generated.append(GeneratedImage(prompt=prompt, filename=source.filename, path=source.path, s3_url=source.s3_url))
+            continue
+        filename = f"image_{idx:02d}.png"
+        path = os.path.join(project_dir, filename)
+        shutil.copyfile(source.path, path)
+        generated.append(GeneratedImage(prompt=prompt, filename=filename, path=path))
+    return generated
+
 
 class Dalle3Generator(ImageGenerator):
     name = "dalle3"
 
     def __init__(self, image_size: str = "1024x1024"):
         self.image_size = image_size
+        self.model = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1")
         self._api_key = os.getenv("OPENAI_API_KEY")
         if not self._api_key:
             raise ImageGenerationError("Brak zmiennej środowiskowej OPENAI_API_KEY dla DALL·E 3.")
+        self._client = None
+        self._legacy_configured = False
+        # Ustawiane po pierwszym ImportError – kolejne prompty od razu idą przez klienta legacy.
+        self._use_legacy = False
 
-    def _generate_with_new_client(self, prompt: str) -> str:
-        from openai import OpenAI  # type: ignore
+    def _get_client(self):
+        if self._client is None:
+            # Import przy pierwszym użyciu – workery bez generowania nie ładują openai.
+            # ImportError (openai < 1.0) przełącza na klienta legacy.
+            from openai import OpenAI  # type: ignore
 
-        client = OpenAI(api_key=self._api_key)
-        response = client.images.generate(
-            model="gpt-image-1",
-            prompt=prompt,
-            size=self.image_size,
-            quality="high",
-            n=1,
-        )
+            self._client = OpenAI(api_key=self._api_key)
+        return self._client
+
+    def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def _request_options(self) -> Dict[str, object]:
+        options: Dict[str, object] = {"model": self.model, "size": self.image_size, "n": 1}
+        if self.model.startswith("dall-e"):
+            # Modele DALL·E potrafią zwrócić URL – PNG pobieramy strumieniowo, bez base64.
+            options["response_format"] = "url"
+        else:
+            options["quality"] = "high"
+        return options
+
+    @staticmethod
+    def _payload_from_item(item) -> ImagePayload:
+        b64 = getattr(item, "b64_json", None)
+        url = getattr(item, "url", None)
+        if isinstance(item, dict):
+            b64 = b64 or item.get("b64_json")
+            url = url or item.get("url")
+        if b64:
+            return b64
+        if url:
+            return ImageURL(url)
+        raise ImageGenerationError("Odpowiedź DALL·E 3 nie zawiera obrazu (b64_json ani url).")
+
+    def _generate_with_new_client(self, prompt: str) -> ImagePayload:
+        client = self._get_client()
+        response = client.images.generate(prompt=prompt, **self._request_options())
         if not response.data:
             raise ImageGenerationError("Puste dane odpowiedzi z DALL·E 3.")
-        return response.data[0].b64_json
+        return self._payload_from_item(response.data[0])
 
-    def _generate_with_legacy_client(self, prompt: str) -> str:
+    def _generate_with_legacy_client(self, prompt: str) -> ImagePayload:
         import openai  # type: ignore
-
-        openai.api_key = self._api_key
+        if not self._legacy_configured:
+            openai.api_key = self._api_key
+            self._legacy_configured = True
         try:
             # Nowe modele są obsługiwane przez images.generate w nowszym kliencie.
-            response = openai.images.generate(
-                model="gpt-image-1",
-                prompt=prompt,
-                size=self.image_size,
-                quality="high",
-                n=1,
-            )
+            response = openai.images.generate(prompt=prompt, **self._request_options())
         except AttributeError as exc:
             raise ImageGenerationError(
                 "Zainstalowany pakiet openai nie wspiera images.generate – zaktualizuj bibliotekę."
@@ -70,39 +488,30 @@ class Dalle3Generator(ImageGenerator):
         data = getattr(response, "data", None) or response.get("data")  # type: ignore[union-attr]
         if not data:
             raise ImageGenerationError("Puste dane odpowiedzi z DALL·E 3.")
-        first = data[0]
-        return getattr(first, "b64_json", None) or first.get("b64_json")  # type: ignore[union-attr]
+        return self._payload_from_item(data[0])
 
-    def _generate_single(self, prompt: str) -> bytes:
+    def _generate_single(self, prompt: str) -> ImagePayload:
+        if self._use_legacy:
+            return self._generate_with_legacy_client(prompt)
         try:
-            return base64.b64decode(self._generate_with_new_client(prompt))
+            return self._generate_with_new_client(prompt)
         except ImportError:
-            return base64.b64decode(self._generate_with_legacy_client(prompt))
+            self._use_legacy = True
+            return self._generate_with_legacy_client(prompt)
         except ImageGenerationError:
             raise
         except Exception as exc:
             # spróbuj klienta legacy jako fallback
             try:
-                return base64.b64decode(self._generate_with_legacy_client(prompt))
+                return self._generate_with_legacy_client(prompt)
             except Exception:
                 raise ImageGenerationError(f"Błąd generowania DALL·E 3: {exc}") from exc
 
     def generate(self, prompts: Sequence[str], project_dir: str) -> List[GeneratedImage]:
-        generated: List[GeneratedImage] = []
-        for idx, prompt in enumerate(prompts, start=1):
-            raw_image = self._generate_single(prompt)
-            filename = f"image_{idx:02d}.png"
-            path = os.path.join(project_dir, filename)
-            with open(path, "wb") as fp:
-                fp.write(raw_image)
-            generated.append(
-                GeneratedImage(
-                    prompt=prompt,
-                    filename=filename,
-                    path=path,
-                )
-            )
-        return generated
+        def fetch(idx: int, prompt: str) -> ImagePayload:
+            return self._generate_single(prompt)
+
+        return _generate_parallel(fetch, prompts, project_dir)
 
 
 class GeminiGenerator(ImageGenerator):
@@ -140,7 +549,7 @@ class GeminiGenerator(ImageGenerator):
         if configured:
             candidate_list.append(configured)
         candidate_list.extend(base_candidates)
-        self._model_methods: Dict[str, List[str]] = {}
+        self._model_methods: Dict[str, FrozenSet[str]] = {}
         candidate_list.extend(self._discover_available_models())
         seen = set()
         self._model_candidates: List[str] = []
@@ -159,55 +568,111 @@ class GeminiGenerator(ImageGenerator):
         self._image_models: Dict[str, Optional[object]] = {}
         self._content_models: Dict[str, Optional[object]] = {}
         self._active_model: Optional[str] = None
+        # (id(callable owner), method) -> indeks działającego wariantu payloadu / akceptowane parametry
+        self._working_variants: Dict[Tuple[int, str], int] = {}
+        self._signature_cache: Dict[Tuple[int, str], Optional[frozenset]] = {}
+        # model -> (indeks endpointu, indeks payloadu) ostatniego udanego wywołania REST
+        self._rest_combos: Dict[str, Tuple[int, int]] = {}
+
+        # Batch Mode: tańsze, ale asynchroniczne – tylko na życzenie (GEMINI_BATCH_MODE=1).
+        self._batch_mode = os.getenv("GEMINI_BATCH_MODE", "0") == "1"
+        self._batch_model = os.getenv("GEMINI_BATCH_MODEL", "models/gemini-2.5-flash-image")
+        try:
+            self._batch_timeout = float(os.getenv("GEMINI_BATCH_TIMEOUT", "1800"))
+        except ValueError:
+            self._batch_timeout = 1800.0
 
     def _discover_available_models(self) -> List[str]:
         models: List[str] = []
         try:
-            all_models = list(self._genai.list_models())
+            all_models = _cached_list_models(self._api_key)
         except Exception as exc:
             self.logger.warning("Gemini list_models failed: %s", exc)
             return models
-        for model in all_models:
-            name = getattr(model, "name", "")
-            if not name:
-                continue
-            methods = (
-                getattr(model, "generation_methods", None)
-                or getattr(model, "supported_generation_methods", None)
-                or []
-            )
-            methods = [str(m) for m in methods]
+        for name, listed_methods in all_models:
+            methods = frozenset(m.lower() for m in listed_methods)
             self._model_methods[name] = methods
-            methods_lower = [str(m).lower() for m in methods]
-            if any("image" in m for m in methods_lower) or name.endswith("imagegeneration") or "imagen" in name.lower():
+            if any("image" in m for m in methods) or name.endswith("imagegeneration") or "imagen" in name.lower():
                 models.append(name)
         if models:
             self.logger.info(
                 "Gemini available models: %s",
-                ", ".join(f"{m} (methods={self._model_methods.get(m)})" for m in models),
+                ", ".join(f"{m} (methods={sorted(self._model_methods.get(m, ()))})" for m in models),
             )
         else:
             self.logger.info("Gemini list_models returned no image-capable models.")
         return models
 
     def generate(self, prompts: Sequence[str], project_dir: str) -> List[GeneratedImage]:
-        generated: List[GeneratedImage] = []
-        for idx, prompt in enumerate(prompts, start=1):
+        if self._batch_mode and len(prompts) > 1:
+            try:
+                payloads = self._generate_batch(prompts)
+            except Exception as exc:
+                self.logger.warning("Gemini batch mode failed, falling back to per-prompt calls: %s", exc)
+            else:
+                return [
+                    _store_image(project_dir, idx, prompt, payload)
+                    for idx, (prompt, payload) in enumerate(zip(prompts, payloads), start=1)
+                ]
+
+        def fetch(idx: int, prompt: str) -> ImagePayload:
             try:
                 self.logger.info("Gemini rendering prompt %d/%d", idx, len(prompts))
-                img_bytes = self._generate_image(prompt)
+                return self._generate_image(prompt)
             except Exception as exc:
                 raise ImageGenerationError(f"Błąd Gemini: {exc}") from exc
 
-            filename = f"image_{idx:02d}.png"
-            path = os.path.join(project_dir, filename)
-            with open(path, "wb") as fp:
-                fp.write(img_bytes)
+        return _generate_parallel(fetch, prompts, project_dir)
+
+    def _generate_batch(self, prompts: Sequence[str]) -> List[ImagePayload]:
+        """Submit all prompts as one Gemini Batch Mode job and wait for its inline results."""
+        try:
+            from google import genai as genai_sdk  # type: ignore
+        except ImportError as exc:
+            raise ImageGenerationError("Tryb wsadowy Gemini wymaga pakietu google-genai.") from exc
+
+        client = genai_sdk.Client(api_key=self._api_key)
+        batch_requests = [
+            {
+                "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                "config": {"response_modalities": ["TEXT", "IMAGE"]},
+            }
+            for prompt in prompts
+        ]
+        job = client.batches.create(
+            model=self._batch_model,
+            src=batch_requests,
+            config={"display_name": "news-to-image"},
+        )
+        self.logger.info("Gemini batch job %s created for %d prompts", job.name, len(prompts))
+
+        deadline = time.monotonic() + self._batch_timeout
+        while True:
+            job = client.batches.get(name=job.name)
+            state = getattr(job.state, "name", str(job.state))
+            if state in _BATCH_FINAL_STATES:
+                break
+            if time.monotonic() > deadline:
+                raise ImageGenerationError(f"Zadanie wsadowe Gemini {job.name} przekroczyło limit czasu ({state}).")
+            time.sleep(_BATCH_POLL_SECONDS)
+        if state != "JOB_STATE_SUCCEEDED":
+            raise ImageGenerationError(f"Zadanie wsadowe Gemini {job.name} zakończone stanem {state}.")
 
-            generated.append(GeneratedImage(prompt=prompt, filename=filename, path=path))
-        return generated
+        responses = getattr(getattr(job, "dest", None), "inlined_responses", None) or []
+        if len(responses) != len(prompts):
+            raise ImageGenerationError(
+                f"Zadanie wsadowe Gemini zwróciło {len(responses)} odpowiedzi dla {len(prompts)} promptów."
+            )
+        payloads: List[ImagePayload] = []
+        for idx, item in enumerate(responses, start=1):
+            error = getattr(item, "error", None)
+            payload = None if error else self._extract_inline_image(getattr(item, "response", None))
+            if not payload:
+                raise ImageGenerationError(f"Gemini batch nie zwrócił obrazu dla promptu {idx}: {error}")
+            payloads.append(payload)
+        return payloads
 
-    def _generate_image(self, prompt: str) -> bytes:
+    def _generate_image(self, prompt: str) -> ImagePayload:
         candidates = self._ordered_candidates()
         last_error: Optional[Exception] = None
         all_not_found = True
@@ -225,6 +690,8 @@ class GeminiGenerator(ImageGenerator):
                     all_not_found = False
                 continue
         if all_not_found and last_error:
+            # Klucz mógł zmienić uprawnienia – kolejny generator wykona ponowne list_models().
+            _invalidate_models_cache(self._api_key)
             raise ImageGenerationError(
                 "Google Gemini nie udostępnia modeli obrazu dla tego klucza API (404). "
                 "Wejdź do Google AI Studio i włącz Imagen / Image generation dla używanego klucza. "
@@ -239,8 +706,8 @@ class GeminiGenerator(ImageGenerator):
             if cand != self._active_model:
                 yield cand
 
-    def _generate_with_model(self, model_name: str, prompt: str) -> bytes:
-        methods_lower = [m.lower() for m in self._model_methods.get(model_name, [])]
+    def _generate_with_model(self, model_name: str, prompt: str) -> ImagePayload:
+        methods = self._model_methods.get(model_name, frozenset())
         image_model = self._get_image_model(model_name)
         if image_model:
             try:
@@ -261,9 +728,9 @@ class GeminiGenerator(ImageGenerator):
 
         content_model = self._get_content_model(model_name)
         if not content_model or (
-            methods_lower and not any("content" in m for m in methods_lower)
+            methods and methods.isdisjoint(_CONTENT_METHODS)
         ):
-            self.logger.debug("Skipping generate_content for %s (methods=%s)", model_name, methods_lower)
+            self.logger.debug("Skipping generate_content for %s (methods=%s)", model_name, sorted(methods))
             content_model = None
 
         if content_model:
@@ -285,10 +752,7 @@ class GeminiGenerator(ImageGenerator):
         except Exception as exc:
             raise ImageGenerationError(f"Gemini {model_name} fallback HTTP error: {exc}") from exc
 
-    def _call_rest_generate(self, model_name: str, prompt: str) -> bytes:
-        import json
-        import requests
-
+    def _call_rest_generate(self, model_name: str, prompt: str) -> ImagePayload:
         endpoints = [
             f"https://generativelanguage.googleapis.com/v1beta/{model_name}:predict",
             f"https://generativelanguage.googleapis.com/v1beta/{model_name}:generateImage",
@@ -308,54 +772,58 @@ class GeminiGenerator(ImageGenerator):
                 "prompt": {"text": prompt},
             },
         ]
+        combos = [(e, v) for e in range(len(endpoints)) for v in range(len(payload_variants))]
+        cached = self._rest_combos.get(model_name)
+        if cached in combos:
+            combos.remove(cached)
+            combos.insert(0, cached)
         last_error: Optional[Exception] = None
-        for url in endpoints:
-            for payload in payload_variants:
-                try:
-                    self.logger.debug("Gemini HTTP call %s payload=%s", url, list(payload.keys()))
-                    resp = requests.post(
-                        url,
-                        params=params,
-                        headers={"Content-Type": "application/json"},
-                        data=json.dumps(payload),
-                        timeout=60,
-                    )
-                    if resp.status_code >= 400:
-                        last_error = RuntimeError(f"HTTP {resp.status_code}: {resp.text[:200]}")
-                        continue
-                    data = resp.json()
-                except Exception as exc:
-                    last_error = exc
+        for combo in combos:
+            url = endpoints[combo[0]]
+            payload = payload_variants[combo[1]]
+            try:
+                self.logger.debug("Gemini HTTP call %s payload=%s", url, list(payload.keys()))
+                resp = _get_rest_session().post(
+                    url,
+                    params=params,
+                    headers={"Content-Type": "application/json"},
+                    data=json.dumps(payload),
+                    timeout=60,
+                )
+                if resp.status_code >= 400:
+                    last_error = RuntimeError(f"HTTP {resp.status_code}: {resp.text[:200]}")
                     continue
-                img_bytes = self._extract_rest_response(data)
-                if img_bytes:
-                    return img_bytes
+                data = resp.json()
+            except Exception as exc:
+                last_error = exc
+                continue
+            img_bytes = self._extract_rest_response(data)
+            if img_bytes:
+                self._rest_combos[model_name] = combo
+                return img_bytes
         if last_error:
             raise last_error
         raise ImageGenerationError("Gemini HTTP API nie zwrócił obrazu.")
 
     @staticmethod
-    def _extract_rest_response(data: Dict) -> Optional[bytes]:
+    def _extract_rest_response(data: Dict) -> Optional[ImagePayload]:
         if not data:
             return None
-        images = (
-            data.get("images")
-            or data.get("generatedImages")
-            or data.get("responses")
-            or data.get("predictions")
-        )
-        if isinstance(images, list):
-            first = images[0]
-            if isinstance(first, dict):
-                if "image" in first and isinstance(first["image"], dict):
-                    raw = first["image"].get("bytesBase64") or first["image"].get("b64_json")
-                else:
-                    raw = first.get("b64_json") or first.get("bytesBase64") or first.get("inlineData")
-                if raw:
-                    if isinstance(raw, dict):
-                        raw = raw.get("data")
-                    if isinstance(raw, str):
-                        return base64.b64decode(raw)
+        images = _first_present(data, _REST_LIST_KEYS)
+        if not isinstance(images, list):
+            return None
+        first = images[0]
+        if not isinstance(first, dict):
+            return None
+        nested = first.get("image")
+        if isinstance(nested, dict):
+            raw = _first_present(nested, _REST_NESTED_B64_KEYS)
+        else:
+            raw = _first_present(first, _REST_B64_KEYS)
+        if isinstance(raw, dict):
+            raw = raw.get("data")
+        if raw and isinstance(raw, str):
+            return raw
         return None
 
     def _invoke_function_with_variants(self, func, prompt: str, model_name: Optional[str]):
@@ -365,11 +833,15 @@ class GeminiGenerator(ImageGenerator):
             {"model": model_name, "prompt": prompt},
             {"prompt": prompt},
         ]
+        key = (id(func), "__call__")
+        accepted = self._accepted_params(key, func)
         last_error: Optional[Exception] = None
-        for payload in payloads:
-            payload = {k: v for k, v in payload.items() if v is not None}
+        for variant in self._variant_order(key, len(payloads)):
+            payload = {k: v for k, v in payloads[variant].items() if v is not None}
+            if accepted is not None and not accepted.issuperset(payload):
+                continue
             try:
-                return func(**payload)
+                result = func(**payload)
             except TypeError as exc:
                 last_error = exc
                 self.logger.debug("Function API TypeError with payload %s: %s", payload, exc)
@@ -378,10 +850,37 @@ class GeminiGenerator(ImageGenerator):
                 last_error = exc
                 self.logger.debug("Function API error with payload %s: %s", payload, exc)
                 break
+            self._working_variants[key] = variant
+            return result
         if last_error:
             raise last_error
         raise ImageGenerationError("Nie udało się wywołać funkcji generowania obrazów Gemini.")
 
+    def _variant_order(self, key: Tuple[int, str], count: int) -> List[int]:
+        """Payload variant indices to try, the last successful one for this callable first."""
+        order = list(range(count))
+        preferred = self._working_variants.get(key)
+        if preferred is not None and preferred < count:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        return order
+
+    def _accepted_params(self, key: Tuple[int, str], method) -> Optional[frozenset]:
+        """Keyword names accepted by method (None when unknown or **kwargs), computed once per callable."""
+        if key in self._signature_cache:
+            return self._signature_cache[key]
+        try:
+            params = list(inspect.signature(method).parameters.values())
+        except (TypeError, ValueError):
+            accepted = None
+        else:
+            if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params):
+                accepted = None
+            else:
+                accepted = frozenset(p.name for p in params)
+        self._signature_cache[key] = accepted
+        return accepted
+
     @staticmethod
     def _is_not_found_error(exc: Exception) -> bool:
         msg = str(exc).lower()
@@ -396,7 +895,7 @@ class GeminiGenerator(ImageGenerator):
             self._image_models[model_name] = None
             return None
         try:
-            model = self._image_model_cls(model_name=model_name)
+            model = _cached_sdk_model(self._image_model_cls, self._api_key, model_name)
             self.logger.debug("Initialized ImageGenerationModel for %s", model_name)
         except Exception as exc:
             self.logger.debug("Failed to init ImageGenerationModel %s: %s", model_name, exc)
@@ -408,7 +907,7 @@ class GeminiGenerator(ImageGenerator):
         if model_name in self._content_models:
             return self._content_models[model_name]
         try:
-            model = self._genai.GenerativeModel(model_name)
+            model = _cached_sdk_model(self._genai.GenerativeModel, self._api_key, model_name)
             self.logger.debug("Initialized GenerativeModel for %s", model_name)
         except Exception as exc:
             self.logger.debug("Failed to init GenerativeModel %s: %s", model_name, exc)
@@ -471,12 +970,16 @@ class GeminiGenerator(ImageGenerator):
                 {"text": prompt},
                 {"contents": [{"role": "user", "parts": [{"text": prompt}]}]},
             ]
-            for base in base_payloads:
-                opts = dict(base)
+            key = (id(target), method_name)
+            accepted = self._accepted_params(key, method)
+            for variant in self._variant_order(key, len(base_payloads)):
+                opts = dict(base_payloads[variant])
                 if model_name is not None:
                     opts.setdefault("model", model_name)
+                if accepted is not None and not accepted.issuperset(opts):
+                    continue
                 try:
-                    return method(**opts)
+                    result = method(**opts)
                 except TypeError as exc:
                     last_error = exc
                     self.logger.debug(
@@ -496,12 +999,14 @@ class GeminiGenerator(ImageGenerator):
                         exc,
                     )
                     break  # move to next method
+                self._working_variants[key] = variant
+                return result
         if last_error:
             raise last_error
         raise ImageGenerationError("Brak obsługiwanej metody generowania obrazów dla Gemini.")
 
     @staticmethod
-    def _extract_from_images_result(result) -> bytes:
+    def _extract_from_images_result(result) -> ImagePayload:
         images = getattr(result, "images", None) or getattr(result, "data", None)
         if not images:
             raise ImageGenerationError("Gemini nie zwrócił żadnych obrazów.")
@@ -513,12 +1018,10 @@ class GeminiGenerator(ImageGenerator):
         )
         if raw is None:
             raise ImageGenerationError("Nieznany format zwróconego obrazu Gemini.")
-        if isinstance(raw, str):
-            return base64.b64decode(raw)
         return raw
 
     @staticmethod
-    def _extract_inline_image(result) -> bytes | None:
+    def _extract_inline_image(result) -> Optional[ImagePayload]:
         candidates = getattr(result, "candidates", []) or []
         for cand in candidates:
             content = getattr(cand, "content", None) or cand
@@ -526,14 +1029,9 @@ class GeminiGenerator(ImageGenerator):
             for part in parts:
                 inline = getattr(part, "inline_data", None)
                 if inline and getattr(inline, "data", None):
-                    data = inline.data
-                    if isinstance(data, str):
-                        return base64.b64decode(data)
-                    return data
+                    return inline.data
                 data = getattr(part, "data", None)
                 if data:
-                    if isinstance(data, str):
-                        return base64.b64decode(data)
                     return data
         return None
 
@@ -541,8 +1039,9 @@ class GeminiGenerator(ImageGenerator):
 class PlaceholderExtensionGenerator(ImageGenerator):
     """Generator wskazujący miejsce na integrację z zewnętrznym silnikiem."""
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, image_size: str = "1024x1024"):
         self.name = name
+        self.image_size = image_size
 
     def generate(self, prompts: Sequence[str], project_dir: str) -> List[GeneratedImage]:
         raise ImageGenerationError(
@@ -551,11 +1050,11 @@ class PlaceholderExtensionGenerator(ImageGenerator):
         )
 
 
-REGISTERED_GENERATORS = {
+REGISTERED_GENERATORS: Dict[str, Callable[..., ImageGenerator]] = {
     "dalle3": Dalle3Generator,
     "gemini": GeminiGenerator,
-    "midjourney": lambda **kwargs: PlaceholderExtensionGenerator("Midjourney"),
-    "bluewillow": lambda **kwargs: PlaceholderExtensionGenerator("BlueWillow"),
+    "midjourney": partial(PlaceholderExtensionGenerator, "Midjourney"),
+    "bluewillow": partial(PlaceholderExtensionGenerator, "BlueWillow"),
 }
 
 
@@ -564,7 +1063,7 @@ def get_generator(engine: str, image_size: str = "1024x1024") -> ImageGenerator:
     factory = REGISTERED_GENERATORS.get(engine)
     if not factory:
         raise ImageGenerationError(f"Nieznany silnik obrazów: {engine}")
-    generator = factory(image_size=image_size) if callable(factory) else factory(image_size=image_size)  # type: ignore[call-arg]
+    generator = factory(image_size=image_size)
     if not isinstance(generator, ImageGenerator):
         raise ImageGenerationError(f"Fabryka silnika {engine} zwróciła niepoprawny obiekt.")
     return generator
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger("news_to_image.manifest_index")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifests (
+    project_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    engine TEXT,
+    title TEXT,
+    status TEXT,
+    source_url TEXT,
+    outputs_json TEXT
+)
+"""
+_CREATED_INDEX = "CREATE INDEX IF NOT EXISTS manifests_created_at ON manifests(created_at DESC)"
+
+
+class ManifestIndex:
+    """SQLite index of project manifests used by the project list.
+
+    ``manifest.json`` files remain the source of truth; the index only keeps the
+    columns the list view needs, so listing is one SELECT instead of reading
+    and parsing every manifest.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    conn.execute(_SCHEMA)
+                    conn.execute(_CREATED_INDEX)
+                    conn.commit()
+                    self._ready = True
+        return conn
+
+    @staticmethod
+    def _row_from_manifest(manifest: Dict) -> tuple:
+        article = manifest.get("article") or {}
+        return (
+            manifest.get("project_id"),
+            manifest.get("created_at"),
+            manifest.get("engine"),
+            manifest.get("title") or article.get("title"),
+            manifest.get("status"),
+            manifest.get("source_url"),
+            json.dumps(manifest.get("outputs") or [], ensure_ascii=False, default=str),
+        )
+
+    def upsert(self, manifests: Iterable[Dict]) -> None:
+        rows = [self._row_from_manifest(m) for m in manifests if m.get("project_id")]
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO manifests "
+                        "(project_id, created_at, engine, title, status, source_url, outputs_json) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.warning("Manifest index write failed: %s", exc)
+
+    def project_ids(self) -> Optional[set]:
+        try:
+            conn = self._connect()
+            try:
+                return {row[0] for row in conn.execute("SELECT project_id FROM manifests")}
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.warning("Manifest index read failed: %s", exc)
+            return None
+
+    def list(self, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Return indexed manifests, newest first, or None when the index is unusable."""
+        query = (
+            "SELECT project_id, created_at, engine, title, status, source_url, outputs_json "
+            "FROM manifests ORDER BY created_at DESC"
+        )
+        params: tuple = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.warning("Manifest index read failed: %s", exc)
+            return None
+
+        entries: List[Dict] = []
+        for project_id, created_at, engine, title, status, source_url, outputs_json in rows:
+            try:
+                outputs = json.loads(outputs_json) if outputs_json else []
+            except ValueError:
+                outputs = []
+            entries.append({
+                "project_id": project_id,
+                "project_dir": project_id,
+                "created_at": created_at,
+                "engine": engine,
+                "title": title,
+                "article": {"title": title},
+                "status": status,
+                "source_url": source_url,
+                "outputs": outputs,
+            })
+        return entries
+
+
+def manifest_dirs(projects_dir: str) -> List[str]:
+    """Names of project directories that contain a manifest.json."""
+    if not os.path.isdir(projects_dir):
+        return []
+    return [
+        item
+        for item in os.listdir(projects_dir)
+        if os.path.isfile(os.path.join(projects_dir, item, "manifest.json"))
+    ]
@@ -1,27 +1,53 @@
+import hashlib
 import json
 import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, List, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from flask import (
     Blueprint,
+    Response,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
     send_from_directory,
     session,
+    stream_template,
     url_for,
 )
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 from auth import login_required
-from llm import ask_model_openai
-from news_to_video.main import scrap_page
+from news_to_video.config import _ACTIVE_JOBS, get_executor
 from markupsafe import Markup
 import logging
 
-from .config import DEFAULT_IMAGE_SIZE, DEFAULT_LANGUAGE, PROJECTS_DIR, ensure_project_paths
+from .config import (
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_LANGUAGE,
+    MANIFEST_INDEX_PATH,
+    PROJECTS_DIR,
+    PROMPT_CACHE_DIR,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    ImageProjectPaths,
+    ensure_project_paths,
+)
 from .generators import GeneratedImage, ImageGenerationError, get_generator
+from .manifest_index import ManifestIndex, manifest_dirs
+from .semantic_cache import SemanticPromptCache
 
 
 news_to_image_bp = Blueprint(
@@ -41,20 +67,140 @@ AVAILABLE_ENGINES = [
 
 logger = logging.getLogger("news_to_image")
 
+_ACTIVE_JOBS_LOCK = threading.Lock()
+# Trwające generowania: klucz (URL artykułu, silnik, liczba obrazów) -> project_id;
+# None = klucz zarezerwowany (pobieranie artykułu), zadanie jeszcze nie wystartowało.
+_INFLIGHT: Dict[str, Optional[str]] = {}
+# ETA w /status: start trwających zadań (project_id -> (monotonic, silnik)) i średni czas
+# zakończonych zadań na silnik (średnia wykładnicza, w tym procesie); pod _ACTIVE_JOBS_LOCK.
+_JOB_STARTED: Dict[str, Tuple[float, str]] = {}
+_JOB_SECONDS: Dict[str, float] = {}
+_DEFAULT_JOB_SECONDS = 45.0
+_JOB_SECONDS_ALPHA = 0.3
+_SEMANTIC_CACHE = SemanticPromptCache(PROMPT_CACHE_DIR, SEMANTIC_CACHE_THRESHOLD)
+_MANIFEST_INDEX = ManifestIndex(MANIFEST_INDEX_PATH)
+_INDEX_SYNC_LOCK = threading.Lock()
+_index_synced = False
+_SCAN_WORKERS = 8
+_ASSET_MAX_AGE = 365 * 24 * 3600
+_STREAM_LIST_MIN = 200
+# Ostatnia lista projektów; klucz: mtime katalogu projektów i bazy indeksu + limit.
+_LIST_CACHE: Dict = {"key": None, "data": []}
+_LIST_CACHE_LOCK = threading.Lock()
+# Limit treści artykułu w prompcie LLM (koszt tokenów).
+_SUMMARY_MAX_CHARS = 1200
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+# Lista JSON w odpowiedzi LLM otoczonej ```json lub komentarzem.
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+_SCAN_PARALLEL_MIN = 16
+# "pending" bez żywego zadania w tym procesie i starszy niż limit = zadanie utracone (restart/awaria workera).
+_PENDING_TIMEOUT_S = 15 * 60
+
 
 def _save_json(path: str, payload: Dict) -> None:
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+        with open(path, "wb") as fp:
+            fp.write(data)
+        return
     with open(path, "w", encoding="utf-8") as fp:
         json.dump(payload, fp, ensure_ascii=False, indent=2, default=str)
 
 
 def _load_json(path: str) -> Dict:
+    if orjson is not None:
+        with open(path, "rb") as fp:
+            return orjson.loads(fp.read())
     with open(path, "r", encoding="utf-8") as fp:
         return json.load(fp)
 
 
+def _save_manifest(paths: ImageProjectPaths, manifest: Dict) -> None:
+    _save_json(paths.manifest_path, manifest)
+    _MANIFEST_INDEX.upsert([manifest])
+
+
+def _has_live_job(project_id: str) -> bool:
+    with _ACTIVE_JOBS_LOCK:
+        future = _ACTIVE_JOBS.get(project_id)
+    return future is not None and not future.done()
+
+
+def _expire_stale_pending(project_id: str, manifest: Dict) -> Dict:
+    """Oznacza jako "failed" manifest "pending", którego zadanie zaginęło; zapisuje zmianę na dysku."""
+    if manifest.get("status") != "pending" or _has_live_job(project_id):
+        return manifest
+    created_ns = manifest.get("created_at_epoch_ns")
+    if not isinstance(created_ns, int):
+        return manifest
+    if time.time_ns() - created_ns < _PENDING_TIMEOUT_S * 1_000_000_000:
+        return manifest
+    manifest = {
+        **manifest,
+        "status": "failed",
+        "error": "Generowanie przerwane (brak aktywnego zadania, przekroczony limit czasu).",
+    }
+    logger.warning("Project %s stuck in pending; marking as failed", project_id)
+    _save_manifest(ensure_project_paths(project_id), manifest)
+    return manifest
+
+
+def _prompt_cache_path(system_prompt: str, user_prompt: str) -> str:
+    key = hashlib.sha256(f"{system_prompt}\n{user_prompt}".encode("utf-8")).hexdigest()
+    return os.path.join(PROMPT_CACHE_DIR, f"{key}.json")
+
+
+def _load_cached_prompts(path: str, num_images: int) -> Optional[List[str]]:
+    try:
+        prompts = _load_json(path)
+    except (OSError, ValueError):
+        return None
+    if isinstance(prompts, list) and len(prompts) == num_images:
+        return [str(p) for p in prompts]
+    return None
+
+
+def _store_cached_prompts(path: str, prompts: List[str]) -> None:
+    try:
+        os.makedirs(PROMPT_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=PROMPT_CACHE_DIR, suffix=".tmp", delete=False
+        ) as fp:
+            json.dump(prompts, fp, ensure_ascii=False)
+        os.replace(fp.name, path)
+    except OSError as exc:
+        logger.debug("Prompt cache write failed: %s", exc)
+
+
+def _smart_truncate(text: str, max_chars: int = _SUMMARY_MAX_CHARS) -> str:
+    """Cut text to max_chars at the last sentence boundary (hard cut if there is none)."""
+    text = (text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    cut = 0
+    for match in _SENTENCE_END_RE.finditer(head):
+        cut = match.start()
+    return head[:cut] if cut else head.rstrip()
+
+
+def _parse_prompt_list(response: str):
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        return loads(response)
+    except ValueError:
+        match = _JSON_ARRAY_RE.search(response or "")
+        if match is None:
+            raise
+        return loads(match.group(0))
+
+
 def _generate_prompts(article: Dict, num_images: int) -> Sequence[str]:
+    # llm ładuje openai – import dopiero przy pierwszym generowaniu
+    from llm import ask_model_openai, embed_text_openai
+
     title = article.get("title", "").strip()
-    summary = article.get("text", "").strip()
+    summary = _smart_truncate(article.get("text", ""))
     source = article.get("source_url", "").strip()
 
     system_prompt = (
@@ -72,11 +218,34 @@ def _generate_prompts(article: Dict, num_images: int) -> Sequence[str]:
         f"Źródło: {source or 'brak'}"
     ).format(num=num_images)
 
+    cache_path = _prompt_cache_path(system_prompt, user_prompt)
+    cached = _load_cached_prompts(cache_path, num_images)
+    if cached is not None:
+        logger.info("Prompt cache hit: %s", os.path.basename(cache_path))
+        return cached
+
+    embedding = None
+    if SEMANTIC_CACHE_ENABLED and _SEMANTIC_CACHE.available():
+        try:
+            embedding = embed_text_openai(f"{title}\n{summary}")
+        except Exception as exc:
+            logger.debug("Embedding request failed: %s", exc)
+        if embedding is not None:
+            similar = _SEMANTIC_CACHE.lookup(embedding, num_images)
+            if similar and len(similar) == num_images:
+                _store_cached_prompts(cache_path, similar)
+                return similar
+
     try:
         response = ask_model_openai(system_prompt, user_prompt)
-        prompts = json.loads(response)
-        if isinstance(prompts, list) and len(prompts) == num_images:
-            return [str(p).strip() for p in prompts]
+        parsed = _parse_prompt_list(response)
+        if isinstance(parsed, list):
+            # nadmiarowe prompty odrzucamy, za mało -> IndexError i fallback
+            prompts = [str(parsed[i]).strip() for i in range(num_images)]
+            _store_cached_prompts(cache_path, prompts)
+            if embedding is not None:
+                _SEMANTIC_CACHE.add(embedding, num_images, prompts)
+            return prompts
     except Exception:
         pass
 
@@ -88,6 +257,18 @@ def _generate_prompts(article: Dict, num_images: int) -> Sequence[str]:
     return [f"{base_prompt} – wariant {i}" for i in range(1, num_images + 1)]
 
 
+_PROJECTS_PREFIX = os.path.join(PROJECTS_DIR, "")
+
+
+def _manifest_path(img: GeneratedImage) -> str:
+    """Image path relative to PROJECTS_DIR (S3 key for images stored in S3)."""
+    if img.s3_url:
+        return img.path
+    if img.path.startswith(_PROJECTS_PREFIX):
+        return img.path[len(_PROJECTS_PREFIX):]
+    return os.path.relpath(img.path, PROJECTS_DIR)
+
+
 def _create_manifest(
     project_id: str,
     engine: str,
@@ -97,9 +278,11 @@ def _create_manifest(
     status: str,
     error: str | None,
 ) -> Dict:
+    created_ns = time.time_ns()
     return {
         "project_id": project_id,
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": datetime.fromtimestamp(created_ns / 1_000_000_000, timezone.utc).isoformat(),
+        "created_at_epoch_ns": created_ns,
         "engine": engine,
         "source_url": article.get("source_url"),
         "article": {
@@ -112,8 +295,9 @@ def _create_manifest(
         "outputs": [
             {
                 "filename": img.filename,
-                "path": os.path.relpath(img.path, PROJECTS_DIR),
+                "path": _manifest_path(img),
                 "prompt": img.prompt,
+                "s3_url": img.s3_url,
             }
             for img in images
         ],
@@ -164,25 +348,133 @@ def generate_images():
         flash("Podaj adres URL artykułu.", "danger")
         return redirect(url_for("news_to_image.create_form"))
 
+    inflight_key = _inflight_key(article_url, engine, num_images)
+    # sprawdzenie i rezerwacja klucza atomowo – równoległy duplikat nie przejdzie w trakcie scrap_page
+    reserved, running_id = _reserve_inflight(inflight_key)
+    if not reserved:
+        if running_id:
+            logger.info("Reusing in-flight project_id=%s for %s", running_id, article_url)
+            flash("Obrazy dla tego artykułu są już generowane – pokazuję trwający projekt.", "warning")
+            return redirect(url_for("news_to_image.detail_view", project_id=running_id))
+        logger.info("Duplicate request while article is being fetched: %s", article_url)
+        flash("Ten artykuł jest właśnie pobierany do generowania – spróbuj za chwilę.", "warning")
+        return redirect(url_for("news_to_image.create_form"))
+
+    try:
+        return _start_generation(article_url, engine, num_images, inflight_key)
+    except BaseException:
+        _release_inflight(inflight_key)
+        raise
+
+
+def _start_generation(article_url: str, engine: str, num_images: int, inflight_key: str):
+    """Fetch the article and submit the job under an already reserved in-flight key."""
+    from news_to_video.main import scrap_page
+
     try:
         article_payload = scrap_page(article_url, language=DEFAULT_LANGUAGE)
         article_payload["source_url"] = article_url
         logger.info("Scraped article: title=%s length=%s", article_payload.get("title"), len(article_payload.get("text", "")))
     except Exception as exc:
         logger.exception("scrap_page failed: %s", exc)
+        _release_inflight(inflight_key)
         flash(f"Nie udało się pobrać artykułu: {exc}", "danger")
         return redirect(url_for("news_to_image.create_form"))
 
-    prompts = _generate_prompts(article_payload, num_images)
-    logger.debug("Generated prompts count=%s", len(prompts))
-
-    project_id = datetime.utcnow().strftime("img-%Y%m%d-%H%M%S")
+    # sufiks losowy: zgłoszenia wracają od razu, dwa w tej samej sekundzie nie mogą dzielić katalogu
+    project_id = datetime.utcnow().strftime("img-%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
     paths = ensure_project_paths(project_id)
     logger.info("Using project_id=%s engine=%s", project_id, engine)
 
+    # Manifest "pending" od razu – widok projektu i lista działają w trakcie generowania.
+    _save_manifest(
+        paths,
+        _create_manifest(
+            project_id=project_id,
+            engine=engine,
+            article=article_payload,
+            prompts=[],
+            images=[],
+            status="pending",
+            error=None,
+        ),
+    )
+    future = get_executor().submit(_run_generation_job, project_id, engine, article_payload, num_images, paths)
+    with _ACTIVE_JOBS_LOCK:
+        _ACTIVE_JOBS[project_id] = future
+        _INFLIGHT[inflight_key] = project_id
+        _JOB_STARTED[project_id] = (time.monotonic(), engine)
+    future.add_done_callback(lambda _fut: _forget_job(project_id, inflight_key))
+
+    project_url = url_for("news_to_image.detail_view", project_id=project_id)
+    flash(
+        Markup(f"Generowanie obrazów rozpoczęte. <a href=\"{project_url}\">Przejdź do projektu</a>"),
+        "success",
+    )
+    return redirect(project_url)
+
+
+def _forget_job(project_id: str, inflight_key: Optional[str] = None) -> None:
+    with _ACTIVE_JOBS_LOCK:
+        _ACTIVE_JOBS.pop(project_id, None)
+        _JOB_STARTED.pop(project_id, None)
+        if inflight_key and _INFLIGHT.get(inflight_key) == project_id:
+            del _INFLIGHT[inflight_key]
+
+
+def _inflight_key(article_url: str, engine: str, num_images: int) -> str:
+    return hashlib.sha256(f"{article_url}\n{engine}\n{num_images}".encode("utf-8")).hexdigest()
+
+
+def _inflight_project(inflight_key: str) -> Tuple[bool, Optional[str]]:
+    """(in flight, project_id) for the same article/engine/count; caller holds _ACTIVE_JOBS_LOCK.
+
+    A reservation without a job yet (article still being fetched) is in flight with project_id None.
+    """
+    if inflight_key not in _INFLIGHT:
+        return False, None
+    project_id = _INFLIGHT[inflight_key]
+    if project_id is None:
+        return True, None
+    future = _ACTIVE_JOBS.get(project_id)
+    if future is None or future.done():
+        return False, None
+    return True, project_id
+
+
+def _reserve_inflight(inflight_key: str) -> Tuple[bool, Optional[str]]:
+    """Reserve the key unless a job for it is in flight; returns (reserved, running project_id)."""
+    with _ACTIVE_JOBS_LOCK:
+        in_flight, project_id = _inflight_project(inflight_key)
+        if in_flight:
+            return False, project_id
+        _INFLIGHT[inflight_key] = None
+        return True, None
+
+
+def _release_inflight(inflight_key: str) -> None:
+    """Drop a reservation that never got a job (the key of a started job is left alone)."""
+    with _ACTIVE_JOBS_LOCK:
+        if inflight_key in _INFLIGHT and _INFLIGHT[inflight_key] is None:
+            del _INFLIGHT[inflight_key]
+
+
+def _run_generation_job(
+    project_id: str,
+    engine: str,
+    article_payload: Dict,
+    num_images: int,
+    paths: ImageProjectPaths,
+) -> str:
+    """Generate prompts and images in the background executor and store the final manifest."""
+    started = time.monotonic()
+    prompts: Sequence[str] = []
     try:
-        generator = get_generator(engine, image_size=DEFAULT_IMAGE_SIZE)
-        generated_images = generator.generate(prompts, paths.project_dir)
+        # Wywołanie LLM też w tle – request kończy się zaraz po pobraniu artykułu.
+        prompts = _generate_prompts(article_payload, num_images)
+        logger.debug("Generated prompts count=%s", len(prompts))
+        with get_generator(engine, image_size=DEFAULT_IMAGE_SIZE) as generator:
+            generated_images = generator.generate(prompts, paths.project_dir)
         status = "completed"
         error = None
         logger.info("Generated %d images via engine=%s", len(generated_images), engine)
@@ -191,13 +483,11 @@ def generate_images():
         generated_images = []
         error = str(exc)
         logger.error("ImageGenerationError: %s", error)
-        flash(f"Błąd generowania obrazów ({engine}): {error}", "danger")
     except Exception as exc:
         status = "failed"
         generated_images = []
         error = f"Nieoczekiwany błąd: {exc}"
         logger.exception("Unexpected error during generation: %s", exc)
-        flash(error, "danger")
 
     manifest = _create_manifest(
         project_id=project_id,
@@ -208,17 +498,27 @@ def generate_images():
         status=status,
         error=error,
     )
-    _save_json(paths.manifest_path, manifest)
+    _save_manifest(paths, manifest)
+    if status == "completed":
+        _record_job_seconds(engine, time.monotonic() - started)
+    return status
 
-    if status != "completed":
-        return redirect(url_for("news_to_image.create_form"))
 
-    project_url = url_for("news_to_image.detail_view", project_id=project_id)
-    flash(
-        Markup(f"Obrazy zostały wygenerowane. <a href=\"{project_url}\">Przejdź do projektu</a>"),
-        "success",
-    )
-    return redirect(url_for("news_to_image.create_form"))
+def _record_job_seconds(engine: str, seconds: float) -> None:
+    with _ACTIVE_JOBS_LOCK:
+        prev = _JOB_SECONDS.get(engine)
+        _JOB_SECONDS[engine] = seconds if prev is None else prev + _JOB_SECONDS_ALPHA * (seconds - prev)
+
+
+def _job_eta(project_id: str) -> Optional[int]:
+    """Estimated seconds left for a running job, from the average duration of its engine."""
+    with _ACTIVE_JOBS_LOCK:
+        started = _JOB_STARTED.get(project_id)
+        if started is None:
+            return None
+        start, engine = started
+        expected = _JOB_SECONDS.get(engine, _DEFAULT_JOB_SECONDS)
+    return max(0, int(round(expected - (time.monotonic() - start))))
 
 
 @news_to_image_bp.get("/projects/<project_id>")
@@ -229,9 +529,9 @@ def detail_view(project_id: str):
         flash("Nie znaleziono projektu.", "warning")
         return redirect(url_for("news_to_image.create_form"))
 
-    manifest = _load_json(manifest_path)
+    manifest = _expire_stale_pending(project_id, _load_json(manifest_path))
     for output in manifest.get("outputs", []):
-        output["serve_url"] = url_for(
+        output["serve_url"] = output.get("s3_url") or url_for(
             "news_to_image.project_asset",
             project_id=project_id,
             filename=output.get("filename"),
@@ -239,41 +539,143 @@ def detail_view(project_id: str):
     return render_template("news_to_image/detail.html", manifest=manifest)
 
 
+@news_to_image_bp.get("/projects/<project_id>/status")
+@login_required(role=["admin", "redakcja", "moderator", "tester"])
+def project_status(project_id: str):
+    if _has_live_job(project_id):
+        return jsonify({
+            "project_id": project_id,
+            "status": "pending",
+            "eta": _job_eta(project_id),
+            "error": None,
+            "done": False,
+        })
+
+    manifest_path = os.path.join(PROJECTS_DIR, project_id, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return jsonify({"error": "project not found"}), 404
+    manifest = _expire_stale_pending(project_id, _load_json(manifest_path))
+    status = manifest.get("status", "unknown")
+    return jsonify({
+        "project_id": project_id,
+        "status": status,
+        "eta": None,
+        "error": manifest.get("error"),
+        "done": status != "pending",
+    })
+
+
 @news_to_image_bp.get("/projects/<project_id>/assets/<path:filename>")
 @login_required(role=["admin", "redakcja", "moderator", "tester"])
 def project_asset(project_id: str, filename: str):
     project_dir = os.path.join(PROJECTS_DIR, project_id)
-    return send_from_directory(project_dir, filename, as_attachment=False)
-
-
-def _list_manifests() -> List[Dict]:
-    entries: List[Dict] = []
-    if not os.path.isdir(PROJECTS_DIR):
-        return entries
-    for item in os.listdir(PROJECTS_DIR):
-        project_dir = os.path.join(PROJECTS_DIR, item)
-        manifest_path = os.path.join(project_dir, "manifest.json")
-        if not os.path.isfile(manifest_path):
-            continue
-        try:
-            manifest = _load_json(manifest_path)
-        except Exception:
-            continue
-        manifest["project_dir"] = item
-        created_raw = manifest.get("created_at")
+    # Obrazy projektu nie zmieniają się po wygenerowaniu (nowe generowanie = nowy project_id).
+    resp = send_from_directory(
+        project_dir,
+        filename,
+        as_attachment=False,
+        conditional=True,
+        etag=True,
+        max_age=_ASSET_MAX_AGE,
+    )
+    resp.headers["Cache-Control"] = f"private, max-age={_ASSET_MAX_AGE}, immutable"
+    return resp
+
+
+def _read_manifest(item: str) -> Optional[Dict]:
+    try:
+        manifest = _load_json(os.path.join(PROJECTS_DIR, item, "manifest.json"))
+    except Exception:
+        return None
+    manifest.setdefault("project_id", item)
+    manifest["project_dir"] = item
+    return manifest
+
+
+def _scan_manifests(project_ids: Sequence[str]) -> List[Dict]:
+    # Odczyty małych plików nakładają się w wątkach (open/read zwalniają GIL),
+    # co przy wolnych dyskach/montowaniach sieciowych skraca czas skanu.
+    if len(project_ids) < _SCAN_PARALLEL_MIN:
+        results = map(_read_manifest, project_ids)
+        return [m for m in results if m is not None]
+    with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as pool:
+        return [m for m in pool.map(_read_manifest, project_ids) if m is not None]
+
+
+def _sync_manifest_index() -> bool:
+    """Index manifests written before the index existed (once per process)."""
+    global _index_synced
+    if _index_synced:
+        return True
+    with _INDEX_SYNC_LOCK:
+        if _index_synced:
+            return True
+        indexed = _MANIFEST_INDEX.project_ids()
+        if indexed is None:
+            return False
+        missing = [item for item in manifest_dirs(PROJECTS_DIR) if item not in indexed]
+        if missing:
+            logger.info("Indexing %d manifests missing from %s", len(missing), MANIFEST_INDEX_PATH)
+            _MANIFEST_INDEX.upsert(_scan_manifests(missing))
+        _index_synced = True
+    return True
+
+
+def _list_cache_key(limit: Optional[int]) -> Optional[Tuple]:
+    key = [limit]
+    for path in (PROJECTS_DIR, MANIFEST_INDEX_PATH):
         try:
-            manifest["_created_ts"] = datetime.fromisoformat(created_raw.replace("Z", "+00:00"))
-        except Exception:
-            manifest["_created_ts"] = datetime.min.replace(tzinfo=timezone.utc)
-        entries.append(manifest)
-    entries.sort(key=lambda m: m.get("_created_ts", datetime.min.replace(tzinfo=timezone.utc)), reverse=True)
+            key.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+    return tuple(key)
+
+
+def _list_manifests(limit: Optional[int] = None) -> List[Dict]:
+    key = _list_cache_key(limit)
+    with _LIST_CACHE_LOCK:
+        if key is not None and _LIST_CACHE["key"] == key:
+            return _LIST_CACHE["data"]
+    entries = _build_manifest_list(limit)
+    # Klucz sprzed odczytu: zapis w trakcie budowania listy wymusi odświeżenie.
+    with _LIST_CACHE_LOCK:
+        _LIST_CACHE["key"], _LIST_CACHE["data"] = key, entries
     return entries
 
 
+def _build_manifest_list(limit: Optional[int] = None) -> List[Dict]:
+    if _sync_manifest_index():
+        entries = _MANIFEST_INDEX.list(limit)
+        if entries is not None:
+            return entries
+
+    # fallback bez indeksu – odczyt wszystkich manifestów z dysku
+    entries = _scan_manifests(manifest_dirs(PROJECTS_DIR))
+    entries.sort(key=_created_epoch_ns, reverse=True)
+    return entries[:limit] if limit is not None else entries
+
+
+def _created_epoch_ns(manifest: Dict) -> int:
+    epoch_ns = manifest.get("created_at_epoch_ns")
+    if isinstance(epoch_ns, int):
+        return epoch_ns
+    # starsze manifesty mają tylko created_at w ISO
+    try:
+        created = datetime.fromisoformat(manifest.get("created_at").replace("Z", "+00:00"))
+    except Exception:
+        return 0
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return int(created.timestamp() * 1_000_000_000)
+
+
 @news_to_image_bp.get("/projects")
 @login_required(role=["admin", "redakcja", "moderator", "tester"])
 def projects_list():
-    manifests = _list_manifests()
+    manifests = _list_manifests(request.args.get("limit", type=int))
+    if len(manifests) >= _STREAM_LIST_MIN:
+        # długa lista – HTML wysyłany porcjami w trakcie renderowania
+        return Response(stream_template("news_to_image/index.html", projects=manifests))
     return render_template(
         "news_to_image/index.html",
         projects=manifests,
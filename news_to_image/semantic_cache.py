@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+
+logger = logging.getLogger("news_to_image.semantic_cache")
+
+
+class SemanticPromptCache:
+    """Reuse generated prompts for articles whose embeddings are nearly identical.
+
+    Vectors are kept L2-normalized in one float32 matrix, so a lookup is a single
+    matrix-vector product. Both the matrix and the entry list are persisted in
+    ``directory`` and reloaded lazily on first use.
+    """
+
+    def __init__(self, directory: str, threshold: float = 0.92):
+        self.directory = directory
+        self.threshold = threshold
+        self._vectors_path = os.path.join(directory, "semantic_vectors.npy")
+        self._entries_path = os.path.join(directory, "semantic_entries.json")
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._vectors = None
+        self._entries: List[dict] = []
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._entries_path, "r", encoding="utf-8") as fp:
+                entries = json.load(fp)
+            vectors = np.load(self._vectors_path)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, list) and len(entries) == len(vectors):
+            self._entries = entries
+            self._vectors = vectors.astype(np.float32, copy=False)
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]):
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, embedding: Sequence[float], num_images: int) -> Optional[List[str]]:
+        if np is None:
+            return None
+        vec = self._normalize(embedding)
+        with self._lock:
+            self._load()
+            if self._vectors is None or not len(self._entries) or self._vectors.shape[1] != vec.shape[0]:
+                return None
+            scores = self._vectors @ vec
+            for idx in np.argsort(scores)[::-1]:
+                if scores[idx] < self.threshold:
+                    break
+                entry = self._entries[int(idx)]
+                if entry.get("num_images") == num_images:
+                    logger.info("Semantic prompt cache hit (similarity=%.3f)", float(scores[idx]))
+                    return list(entry.get("prompts") or [])
+        return None
+
+    def add(self, embedding: Sequence[float], num_images: int, prompts: Sequence[str]) -> None:
+        if np is None:
+            return
+        vec = self._normalize(embedding)
+        with self._lock:
+            self._load()
+            if self._vectors is not None and self._vectors.shape[1] != vec.shape[0]:
+                # zmiana modelu embeddingów – zaczynamy od nowa
+                self._vectors, self._entries = None, []
+            row = vec.reshape(1, -1)
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._entries.append({"num_images": num_images, "prompts": list(prompts)})
+            self._persist()
+
+    def _persist(self) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".npy", delete=False) as fp:
+                np.save(fp, self._vectors)
+            os.replace(fp.name, self._vectors_path)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+            ) as fp:
+                json.dump(self._entries, fp, ensure_ascii=False)
+            os.replace(fp.name, self._entries_path)
+        except OSError as exc:
+            logger.debug("Semantic cache write failed: %s", exc)
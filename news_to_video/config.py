@@ -1,5 +1,7 @@
 import os
+import json
 import concurrent.futures
+from functools import lru_cache
 from typing import Optional
 # import threading
 # import time
@@ -10,10 +12,12 @@ from apps_utils.s3_utils import (
 BASE_DIR = os.path.dirname(__file__)
 PROJECTS_DIR = os.path.join(BASE_DIR, "projects")
 os.makedirs(PROJECTS_DIR, exist_ok=True)
+# Logo brandingu przeskalowane pod dany format (news_to_video.main._prepare_logo)
+LOGO_CACHE_DIR = os.path.join(BASE_DIR, "cache", "logos")
 # print(f'PROJECTS_DIR====PROJECTS_DIR=====>{PROJECTS_DIR}')
 
-IMG_EXT = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
-VID_EXT = {".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v"}
+IMG_EXT = frozenset({".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"})
+VID_EXT = frozenset({".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v"})
 
 FORMAT_PRESETS = {
     "16x9": (1920, 1080),
@@ -29,57 +33,29 @@ VIDEO_S3_BASE_URL = os.getenv("VIDEO_S3_BASE_URL", "").rstrip("/")     # np. "ht
 S3_ENABLED = bool(VIDEO_S3_BUCKET)
 
 RENDER_MAX_WORKERS = int(os.getenv("RENDER_MAX_WORKERS", "2"))
-_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=RENDER_MAX_WORKERS)
-_ACTIVE_JOBS = {}  # project_id -> Future
+# Koder wideo lokalnego renderera: libx264 | h264_nvenc | h264_qsv | h264_videotoolbox
+# (sprzętowy tylko gdy ffmpeg go ma – inaczej libx264)
+VIDEO_ENCODER = os.getenv("NTV_VIDEO_ENCODER", "libx264").strip().lower() or "libx264"
+# Końcowy MP4: +faststart (moov na początku, dodatkowy przebieg przepisujący plik) albo
+# NTV_MP4_FRAGMENTED=1 – fragmentowany MP4, strumieniowalny bez przepisywania
+MP4_FRAGMENTED = os.getenv("NTV_MP4_FRAGMENTED", "").strip().lower() in ("1", "true", "yes", "on")
+MP4_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof" if MP4_FRAGMENTED else "+faststart"
+# Katalog z fontami dla napisów ASS (np. z dołączonym Arial/DejaVu) – libass bierze fonty stąd
+# zamiast skanować systemowy fontconfig; puste = fonty systemowe
+SUBS_FONTS_DIR = os.getenv("NTV_SUBS_FONTS_DIR", "").strip()
 
 
+@lru_cache(maxsize=1)
+def get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    # Tworzony przy pierwszym zadaniu – workery, które nic nie renderują, go nie mają.
+    return concurrent.futures.ThreadPoolExecutor(max_workers=RENDER_MAX_WORKERS, thread_name_prefix="render")
 
-import json
-test_data = dict()
-test_data = {
-    'entry1': {
-      'title': 'Brytyjska sieć energetyczna zabezpieczona przed awariami. "Nie ma szans na blackout"',
-      'description': 'Brytyjska sieć energetyczna jest bezpieczna i odporna na awarie. Poznaj szczegóły zabezpieczeń na londynek.net!',
-      'images': [
-        'https://assets.aws.londynek.net/images/jdnews-lite/2719994/433496-202509151415-lg.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-lite/2719994/433495-202509151412-lg2.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-lite/2719994/433497-202509151416-lg.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-lite/2719994/433496-202509151415-lg.jpg'
-      ],
-      'main_image': 'https://assets.aws.londynek.net/images/jdnews-lite/2719994/433496-202509151415-lg.jpg'
-    },
-    'entry2': {
-      'title': 'Bliźniacy z hrabstwa Hampshire w Anglii wyhodowali najcięższą i największą dynię na świecie',
-      'description': 'Bliźniacy z hrabstwa Hampshire w Anglii wyhodowali największą i najcięższą dynię na świecie podczas szóstej edycji oficjalnego ważenia gigantycznych dyń w Reading, Berkshire. Ich dynia, rosnąca około 130 dni, przebiła rekord poprzednio należący do Stanów Zjednoczonych. Kluczem do sukcesu były dobre geny oraz system nawadniania kropelkowego, który dostarczał do 500 litrów wody dziennie, mimo obowiązującego zakazu podlewania spowodowanego suszą. Uprawa dyni stała się rodzinną tradycją – braciom pomagały ich wnuczki, które z entuzjazmem rozmawiały nawet z roślinami. Ten sukces pokazuje, że brytyjscy hodowcy mogą rywalizować z najlepszymi na świecie w dziedzinie gigantycznych warzyw.',
-      'images': [
-        'https://assets.aws.londynek.net/images/jdnews-agency/2191248/434223-202509231020-lg2.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-agency/2191248/435423-202510071050-lg2.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-agency/2191248/435424-202510071106-lg.jpg',
-        'https://assets.aws.londynek.net/images/jdnews-agency/2191248/435394-202510070207-lg2.jpg'
-      ],
-      'main_image': 'https://assets.aws.londynek.net/images/jdnews-agency/2191248/435394-202510070207-lg2.jpg'
-    },
-    'entry3': {
-      'title': 'Polka uzyskuje prawie pół miliona funtów odszkodowania',
-      'description': 'Polka, która doznała poważnych obrażeń w wypadku, otrzymała prawie pół miliona funtów odszkodowania dzięki wsparciu kancelarii Sintons. Sprawa pokazuje, jak ważny jest wybór odpowiedniego prawnika i kompleksowa pomoc. Poznaj szczegóły tej niezwykłej historii na londynek.net!',
-      'images': [
-        'https://assets.aws.londynek.net/images/jdnews/2251908/434749-202509282110-lg.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/434748-202509282108-m.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/434750-202509282119-m.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/logos/354764-202306111054-sm.jpg'
-      ],
-      'main_image': 'https://assets.aws.londynek.net/images/jdnews/2251908/434748-202509282108-m.jpg'
-    },
-    'entry4': {
-      'title': 'Teorie spiskowe o ISS i lądowaniu na Księżycu nie znikają mimo dowodów naukowych',
-      'description': 'Teorie spiskowe wokół ISS i lądowania na Księżycu nie ustają, mimo licznych dowodów naukowych. Czy zaawansowana technologia satelitarna wyjaśnia tajemnicze przerwy w łączności? Sprawdź, jak eksperci obalają mity i dlaczego sceptycy wciąż kwestionują fakty. Przeczytaj więcej na londynek.net!',
-      'images': [
-        'https://assets.aws.londynek.net/images/jdnews/2251908/428299-202507141257-lg.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/428300-202507141304-m.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/428301-202507141307-m.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/428302-202507141310-m.jpg',
-        'https://assets.aws.londynek.net/images/jdnews/2251908/428303-202507141315-m.jpg'
-      ],
-      'main_image': 'https://assets.aws.londynek.net/images/jdnews/2251908/428299-202507141257-lg.jpg'
-    },
-}
+
+_ACTIVE_JOBS = {}  # project_id -> Future
+
+
+@lru_cache(maxsize=1)
+def load_test_data() -> dict:
+    """Przykładowe artykuły dla formularza testowego (wczytywane przy pierwszym użyciu)."""
+    with open(os.path.join(BASE_DIR, "sample_entries.json"), "r", encoding="utf-8") as fp:
+        return json.load(fp)
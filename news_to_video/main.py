@@ -1,6 +1,9 @@
 # talk_to/news_to_video/main.py
 # from __future__ import annotations
 import os
+import glob
+import hashlib
+import itertools
 import json
 import uuid
 import ast
@@ -12,13 +15,30 @@ from pydub import AudioSegment
 import shlex
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dataclasses import dataclass
-from typing import Any, List, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple, Union
 from urllib.parse import urlparse, urljoin, parse_qs, urlsplit, urlunsplit, quote, parse_qsl, urlencode
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+try:
+    import lxml  # noqa: F401  # szybszy parser HTML dla BeautifulSoup
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+try:  # logo brandingu skalowane raz, poza ffmpeg
+    from PIL import Image
+except ImportError:
+    Image = None
+try:
+    from mutagen.mp3 import MP3 as _MutagenMP3  # czas MP3 z nagłówków, bez ffprobe
+except ImportError:
+    _MutagenMP3 = None
 import sys
 import traceback
 import math
@@ -31,6 +51,7 @@ from loggers import news_to_video_logger
 from news_to_video.renders_engines.s3_proc import ( 
     save_json,
     load_json,
+    json_loads,
     _s3_ready,
     _s3_key_for_local, 
     _s3_upload_file, 
@@ -62,7 +83,12 @@ except Exception:
 from news_to_video.config import (
     PROJECTS_DIR, 
     FORMAT_PRESETS, 
-    SUPPORTED_RENDERERS
+    LOGO_CACHE_DIR,
+    MP4_MOVFLAGS,
+    RENDER_MAX_WORKERS,
+    SUBS_FONTS_DIR,
+    SUPPORTED_RENDERERS,
+    VIDEO_ENCODER
 )
 
 from config import DEFAULT_MODEL_VERSION, get_config
@@ -92,6 +118,12 @@ class RenderProfile:
     fps: int = 30
     video_bitrate: str = "5000k"
     audio_bitrate: str = "192k"
+    preset: str = "faster"            # x264 dla plików pośrednich (segmenty, wizualia przed brandingiem)
+    final_preset: str = "medium"      # x264 dla pliku, który trafia do wyniku
+    intermediate_preset: str = "ultrafast"  # segmenty per-media (jakość stała CRF zamiast bitrate)
+    intermediate_crf: int = 18
+    crf: int = 22                     # wizualia pośrednie (przed brandingiem): CRF z limitem video_bitrate
+    encoder: str = VIDEO_ENCODER      # libx264 | h264_nvenc | h264_qsv | h264_videotoolbox
 
 @dataclass
 class TTSSettings:
@@ -131,12 +163,16 @@ def _get_renderer_cfg(payload: Dict) -> Dict[str, Any]:
     r = payload.get("renderer") or {}
     return r.get("config") or {}
 
+# transliteracja polskich znaków (po lower()) + zwijanie wszystkiego poza literami/cyframi do "-"
+_SLUG_TABLE = str.maketrans("ąćęłńóśźż", "acelnoszz")
+_SLUG_SEP_RE = re.compile(r"[\W_]+")
+
 def _slugify(text: str) -> str:
     try:
         from slugify import slugify
         return slugify(text)
     except Exception:
-        return "".join(c.lower() if c.isalnum() else "-" for c in text)[:64].strip("-")
+        return _SLUG_SEP_RE.sub("-", (text or "").lower().translate(_SLUG_TABLE))[:64].strip("-")
 
 def _extract_voice_id(v: Any) -> str:
     if isinstance(v, dict):
@@ -153,10 +189,30 @@ def profile_for(fmt: str, base: Optional[RenderProfile] = None) -> RenderProfile
     p = base or RenderProfile()
     return RenderProfile(
         width=w, height=h, fps=p.fps,
-        video_bitrate=p.video_bitrate, audio_bitrate=p.audio_bitrate
+        video_bitrate=p.video_bitrate, audio_bitrate=p.audio_bitrate,
+        preset=p.preset, final_preset=p.final_preset,
+        intermediate_preset=p.intermediate_preset, intermediate_crf=p.intermediate_crf,
+        crf=p.crf, encoder=p.encoder
     )
 
+_PROJECT_ID_RE = re.compile(r"^(\d{4})(\d{2})\d{2}-\d{6}-[0-9a-f]+$")
+
+def _find_project_dir_fast(project_id: str) -> Optional[str]:
+    """Katalog projektu to PROJECTS_DIR/YYYY/MM/<slug>-<project_id> – rok i miesiąc są w project_id."""
+    m = _PROJECT_ID_RE.match(project_id or "")
+    if not m:
+        return None
+    pattern = os.path.join(PROJECTS_DIR, m.group(1), m.group(2), f"*-{glob.escape(project_id)}")
+    for candidate in glob.glob(pattern):
+        if os.path.isfile(os.path.join(candidate, "manifest.json")):
+            return candidate
+    return None
+
 def find_project_dir(project_id: str) -> Optional[str]:
+    pdir = _find_project_dir_fast(project_id)
+    if pdir:
+        return pdir
+    # starsze/nietypowe układy katalogów – pełne przejście drzewa
     for root, dirs, files in os.walk(PROJECTS_DIR):
         if "manifest.json" in files:
             try:
@@ -181,6 +237,9 @@ def delete_project(project_id: str) -> bool:
 def normalize_voice_id(voice_val: Any) -> str:
     if isinstance(voice_val, str):
         s = voice_val.strip()
+        # zwykłe id głosu (np. "pl-PL-Wavenet-A") – bez prób parsowania
+        if not s.startswith("{"):
+            return s
         # spróbuj JSON
         try:
             obj = json.loads(s)
@@ -189,6 +248,8 @@ def normalize_voice_id(voice_val: Any) -> str:
         except Exception:
             pass
         # spróbuj literal_eval (repr dict z pojedynczymi cudzysłowami)
+        if "'" not in s:
+            return s
         try:
             obj = ast.literal_eval(s)
             if isinstance(obj, dict):
@@ -206,16 +267,37 @@ def absolutize(url: str, base: str) -> str:
     except Exception:
         return url
 
-def fetch_html(page_url: str, timeout: int = 15) -> str:
-    headers = {
+def _make_http_session() -> requests.Session:
+    # Jedna sesja na proces: keep-alive i pula połączeń między kolejnymi scrapami.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
         "User-Agent": "Mozilla/5.0 (compatible; NewsToVideoBot/1.0; +https://example.local)"
-    }
-    r = requests.get(page_url, headers=headers, timeout=timeout)
+    })
+    return session
+
+_HTTP = _make_http_session()
+
+def fetch_html(page_url: str, timeout: int = 15) -> str:
+    r = _HTTP.get(page_url, timeout=timeout)
     r.raise_for_status()
     return r.text
 
+_MAIN_SELECTORS = ", ".join(
+    ["article", "[role=main]", "#content", ".content", ".article", ".post", ".entry-content", ".news", ".story"]
+)
+_TEXT_TAGS = frozenset({"p", "h2", "h3", "li"})
+# Elementy niekontentowe usuwane przed zbieraniem tekstu i mediów (jedno zapytanie CSS).
+_STRIP_SELECTORS = "script, style, noscript, nav, footer, header, form, aside, iframe, svg, template"
+
 def extract_article(html: str, base_url: str) -> Dict:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _HTML_PARSER)
 
     # Tytuł
     title = ""
@@ -225,60 +307,46 @@ def extract_article(html: str, base_url: str) -> Dict:
     if og_title and og_title.get("content"):
         title = og_title["content"].strip() or title
 
-    # Główna treść – heurystyki: <article>, [role=main], #content, .article, itp.
-    main_nodes = []
-    for sel in ["article", "[role=main]", "#content", ".content", ".article", ".post", ".entry-content", ".news", ".story"]:
-        main = soup.select_one(sel)
-        if main:
-            main_nodes.append(main)
+    # Główna treść – heurystyki: <article>, [role=main], #content, .article, itp. (jedno zapytanie CSS)
+    main_nodes = soup.select(_MAIN_SELECTORS)
     main = max(main_nodes, key=lambda el: len(el.get_text(" ", strip=True))) if main_nodes else soup.body or soup
 
     # Usuń elementy niekontentowe
-    for bad in main.select("script, style, noscript, nav, footer, header, form, aside"):
+    for bad in main.select(_STRIP_SELECTORS):
         bad.decompose()
 
-    # Zbierz akapity
+    # Jeden przebieg po drzewie: akapity oraz media (img, video > source/src)
     paragraphs = []
-    for p in main.find_all(["p", "h2", "h3", "li"]):
-        txt = p.get_text(" ", strip=True)
-        if txt and len(txt) > 2:
-            paragraphs.append(txt)
+    images = []
+    videos = []
+    for el in main.find_all(["p", "h2", "h3", "li", "img", "video"]):
+        name = el.name
+        if name in _TEXT_TAGS:
+            txt = el.get_text(" ", strip=True)
+            if txt and len(txt) > 2:
+                paragraphs.append(txt)
+        elif name == "img":
+            src = el.get("src") or el.get("data-src") or el.get("data-original")
+            if not src:
+                continue
+            src_abs = absolutize(src, base_url)
+            if detect_media_type(src_abs) == "image":
+                images.append({"type": "image", "src": src_abs})
+        else:
+            vsrcs = [el.get("src")] + [source.get("src") for source in el.find_all("source")]
+            for vsrc in vsrcs:
+                if vsrc:
+                    v_abs = absolutize(vsrc, base_url)
+                    if detect_media_type(v_abs) == "video":
+                        videos.append({"type": "video", "src": v_abs})
     text = "\n".join(paragraphs).strip()
+    media = images + videos
 
-    # Media: img, video > source/src
-    media = []
-    # IMG
-    for img in main.find_all("img"):
-        src = img.get("src") or img.get("data-src") or img.get("data-original")
-        if not src:
-            continue
-        src_abs = absolutize(src, base_url)
-        mtype = detect_media_type(src_abs)
-        if mtype == "image":
-            media.append({"type": "image", "src": src_abs})
-    # VIDEO
-    for v in main.find_all("video"):
-        vsrc = v.get("src")
-        if vsrc:
-            v_abs = absolutize(vsrc, base_url)
-            if detect_media_type(v_abs) == "video":
-                media.append({"type": "video", "src": v_abs})
-        for s in v.find_all("source"):
-            ssrc = s.get("src")
-            if ssrc:
-                s_abs = absolutize(ssrc, base_url)
-                if detect_media_type(s_abs) == "video":
-                    media.append({"type": "video", "src": s_abs})
-
-    # Dedup
-    seen = set()
-    uniq_media = []
+    # Dedup (dict zachowuje kolejność pierwszego wystąpienia)
+    uniq = {}
     for m in media:
-        key = (m["type"], m["src"])
-        if key in seen:
-            continue
-        seen.add(key)
-        uniq_media.append(m)
+        uniq.setdefault((m["type"], m["src"]), m)
+    uniq_media = list(uniq.values())
 
     return {"title": title, "text": text, "media": uniq_media}
 
@@ -302,32 +370,58 @@ def _fallback_summarize(text: str, target_words: int) -> str:
         out = [" ".join(words[:target_words])]
     return " ".join(out).strip()
 
+@lru_cache(maxsize=1)
+def _get_openai_client(api_key: str):
+    # Jeden klient (i pula połączeń HTTP) na proces, zamiast nowego przy każdym streszczeniu.
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
 def _summarize_with_openai(text: str, target_words: int, language: str = "pl") -> Optional[str]:
     """
     Opcjonalne użycie OpenAI (jeśli biblioteka i klucz są dostępne).
     Zwraca streszczenie lub None przy błędzie.
+    Odpowiedź jest strumieniowana i przerywana po przekroczeniu target_words
+    (summarize_to_duration i tak przycina do tej długości).
     """
     try:
         # Nowy klient
         try:
-            import os
-            from openai import OpenAI
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 return None
-            client = OpenAI(api_key=api_key)
+            client = _get_openai_client(api_key)
             prompt = (
                 f"Streść poniższy tekst w języku {language} tak, aby mieścił się w około {target_words} słowach. "
                 "Zachowaj najważniejsze fakty i klarowną narrację dla lektora newsowego.\n"
                 "Na zakończenie dodaj informację na temat źródła czyli londynek.net \n\n"
                 f"--- TEKST ---\n{text}\n--- KONIEC ---"
             )
-            resp = client.chat.completions.create(
+            stream = client.chat.completions.create(
                 model=DEFAULT_MODEL_VERSION,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
+                stream=True,
             )
-            return resp.choices[0].message.content.strip()
+            parts: List[str] = []
+            words = 0
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    words += len(delta.split())
+                    # słowa rozcięte między porcjami liczą się podwójnie – przerwanie jest ostrożne
+                    if words > target_words and len("".join(parts).split()) > target_words:
+                        break
+            finally:
+                close = getattr(stream, "close", None)
+                if callable(close):
+                    close()
+            return "".join(parts).strip() or None
         except Exception:
             return None
 
@@ -360,18 +454,122 @@ def _summarize_with_openai(text: str, target_words: int, language: str = "pl") -
         return summary
     
 
+# Segmenty kodujemy równolegle (prepare_media_segments), każdy ffmpeg na 2 wątkach
+_SEGMENT_THREADS = 2
+
+_HW_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox")
+# presety x264 → NVENC p1 (najszybszy) .. p7 (najlepsza jakość)
+_NVENC_PRESETS = {
+    "ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3",
+    "fast": "p4", "medium": "p4", "slow": "p5", "slower": "p6", "veryslow": "p7",
+}
+# h264_qsv nie zna ultrafast/superfast
+_QSV_PRESETS = {"ultrafast": "veryfast", "superfast": "veryfast"}
+
+
+@lru_cache(maxsize=1)
+def _available_encoders() -> frozenset:
+    """Nazwy koderów wideo z 'ffmpeg -encoders' (raz na proces)."""
+    try:
+        proc = subprocess.run([get_ffmpeg_exe(), "-hide_banner", "-encoders"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        news_to_video_logger.warning("[_available_encoders] ffmpeg -encoders failed: %s", e)
+        return frozenset()
+    names = set()
+    for line in proc.stdout.decode("utf-8", "ignore").splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith("V"):
+            names.add(parts[1])
+    return frozenset(names)
+
+
+@lru_cache(maxsize=8)
+def _resolve_encoder(encoder: str) -> str:
+    enc = (encoder or "libx264").lower()
+    if enc not in _HW_ENCODERS:
+        return "libx264"
+    if enc not in _available_encoders():
+        news_to_video_logger.warning("[_resolve_encoder] %s niedostępny w ffmpeg – używam libx264", enc)
+        return "libx264"
+    return enc
+
+
+def _bitrate_kbps(bitrate: str) -> int:
+    """'5000k' / '5M' / '5000000' → kbps."""
+    b = str(bitrate or "").strip().lower()
+    try:
+        if b.endswith("k"):
+            return int(float(b[:-1]))
+        if b.endswith("m"):
+            return int(float(b[:-1]) * 1000)
+        return int(float(b) / 1000)
+    except ValueError:
+        return 5000
+
+
+def _video_encoder_args(profile: RenderProfile, preset: Optional[str] = None,
+                        intermediate: bool = False) -> List[str]:
+    """
+    Parametry kodera dla kodowania docelowego (bitrate profile.video_bitrate).
+    intermediate=True: wynik idzie jeszcze do kodowania końcowego – stała jakość
+    (CRF/CQ = profile.crf) z limitem maxrate=video_bitrate zamiast docelowego bitrate.
+    preset w nazwach x264; dla NVENC/QSV mapowany na odpowiednik.
+    """
+    preset = preset or profile.final_preset
+    enc = _resolve_encoder(profile.encoder)
+    if intermediate and enc in ("libx264", "h264_nvenc"):
+        kbps = _bitrate_kbps(profile.video_bitrate)
+        cap = ["-maxrate", f"{kbps}k", "-bufsize", f"{2 * kbps}k"]
+        if enc == "h264_nvenc":
+            return ["-c:v", enc, "-preset", _NVENC_PRESETS.get(preset, "p3"),
+                    "-rc", "vbr", "-cq", str(profile.crf), "-b:v", "0", *cap, "-pix_fmt", "yuv420p"]
+        return ["-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", "-crf", str(profile.crf), *cap]
+    if enc == "h264_nvenc":
+        return ["-c:v", enc, "-preset", _NVENC_PRESETS.get(preset, "p4"), "-tune", "hq",
+                "-rc", "vbr", "-cq", "23", "-b:v", profile.video_bitrate,
+                "-bf", "3", "-spatial_aq", "1", "-pix_fmt", "yuv420p"]
+    if enc == "h264_qsv":
+        return ["-c:v", enc, "-preset", _QSV_PRESETS.get(preset, preset),
+                "-b:v", profile.video_bitrate, "-pix_fmt", "nv12"]
+    if enc == "h264_videotoolbox":
+        return ["-c:v", enc, "-b:v", profile.video_bitrate, "-pix_fmt", "yuv420p"]
+    return ["-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", "-b:v", profile.video_bitrate]
+
+
+def _segment_x264_args(profile: RenderProfile) -> List[str]:
+    """
+    Parametry kodera segmentów pośrednich: szybki preset i stała jakość (CRF / CQ), bitrate
+    (profile.video_bitrate) dopiero w końcowym kodowaniu. Identyczne dla wszystkich
+    segmentów, żeby concat z '-c copy' dostawał zgodne strumienie.
+    """
+    enc = _resolve_encoder(profile.encoder)
+    gop = profile.fps * 2
+    q = profile.intermediate_crf
+    if enc == "h264_nvenc":
+        preset = _NVENC_PRESETS.get(profile.intermediate_preset, "p1")
+        return ["-c:v", enc, "-preset", preset, "-rc", "vbr", "-cq", str(q), "-b:v", "0",
+                "-g", str(gop), "-pix_fmt", "yuv420p"]
+    if enc == "h264_qsv":
+        preset = _QSV_PRESETS.get(profile.intermediate_preset, profile.intermediate_preset)
+        return ["-c:v", enc, "-preset", preset, "-global_quality", str(q), "-g", str(gop), "-pix_fmt", "nv12"]
+    if enc == "h264_videotoolbox":
+        return ["-c:v", enc, "-b:v", profile.video_bitrate, "-g", str(gop), "-pix_fmt", "yuv420p"]
+    return ["-c:v", "libx264", "-preset", profile.intermediate_preset, "-crf", str(q),
+            "-g", str(gop), "-pix_fmt", "yuv420p", "-threads", str(_SEGMENT_THREADS)]
+
 def _make_color_segment(duration: float, profile: RenderProfile, out_path: str, color: str = "black") -> bool:
     dur = max(0.2, float(duration))
-    cmd = (
-        f"ffmpeg -y -f lavfi -i color=c={color}:s={profile.width}x{profile.height}:r={profile.fps} "
-        f"-t {dur:.3f} -c:v libx264 -pix_fmt yuv420p -b:v {profile.video_bitrate} -an {shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
+    cmd = [
+        "ffmpeg", "-y", "-f", "lavfi", "-i", f"color=c={color}:s={profile.width}x{profile.height}:r={profile.fps}",
+        "-t", f"{dur:.3f}", *_segment_x264_args(profile), "-an", out_path,
+    ]
+    ok, _ = _run(cmd, capture_stderr=False)
     return ok and os.path.exists(out_path)
 
 # sprawdzenie/uzyskanie publicznego URL dla assetu (HTTP lub upload do S3)
 def _is_http_url(x: str) -> bool:
-    return isinstance(x, str) and (x.startswith("http://") or x.startswith("https://"))
+    return isinstance(x, str) and x.startswith(("http://", "https://"))
 
 def _ensure_remote_url(path_or_url: str, content_type: Optional[str] = None) -> Optional[str]:
     """
@@ -388,21 +586,42 @@ def _ensure_remote_url(path_or_url: str, content_type: Optional[str] = None) ->
         return None
     return _s3_upload_file(path_or_url, key, content_type=content_type)
 
+_S3_UPLOAD_WORKERS = 8
+
+def _ensure_remote_urls(items: List[Tuple[str, Optional[str]]]) -> List[Optional[str]]:
+    """
+    Wersja wsadowa _ensure_remote_url dla listy (ścieżka/URL, content_type).
+    Lokalne pliki wysyła równolegle (wspólny klient S3), wynik w kolejności wejścia;
+    błąd pojedynczego uploadu daje None zamiast przerywać całość.
+    """
+    def _one(item: Tuple[str, Optional[str]]) -> Optional[str]:
+        path_or_url, content_type = item
+        try:
+            return _ensure_remote_url(path_or_url, content_type=content_type)
+        except Exception as e:
+            news_to_video_logger.warning("S3 upload failed for %s: %s", path_or_url, e)
+            return None
+
+    items = list(items)
+    pending = sum(1 for p, _ in items if p and not _is_http_url(p))
+    if pending <= 1:
+        return [_one(item) for item in items]
+    workers = min(_S3_UPLOAD_WORKERS, pending)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-upload") as pool:
+        return list(pool.map(_one, items))
+
 # pomocnicze: generacja prostego SRT (grupowanie do 5 słów, równy podział czasu)
 def _to_srt_timestamp(t: float) -> str:
-    # HH:MM:SS,mmm
-    if t < 0: t = 0.0
-    h = int(t // 3600)
-    m = int((t % 3600) // 60)
-    s = int(t % 60)
-    ms = int(round((t - int(t)) * 1000))
-    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+    # HH:MM:SS,mmm (całkowite milisekundy – bez przepełnienia ms do 1000)
+    total_ms = int(round(max(0.0, t) * 1000))
+    s, ms = divmod(total_ms, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return "%02d:%02d:%02d,%03d" % (h, m, s, ms)
 
 def _chunk_words(text: str, max_words: int = 5) -> List[str]:
-    words = [w for w in re.split(r"\s+", (text or "").strip()) if w]
-    chunks = []
-    for i in range(0, len(words), max_words):
-        chunks.append(" ".join(words[i:i+max_words]))
+    words = (text or "").split()
+    chunks = [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
     return chunks or ([] if not text else [text])
 
 def _write_srt_by_chunks(text: str, total_duration: float, out_path: str, max_words: int = 5):
@@ -411,13 +630,14 @@ def _write_srt_by_chunks(text: str, total_duration: float, out_path: str, max_wo
     n = max(1, len(chunks))
     # równy podział czasu między bloki
     dur = max(0.2, total_duration / n)
+    blocks = []
     t = 0.0
+    for i, line in enumerate(chunks, start=1):
+        t1 = min(total_duration, t + dur)
+        blocks.append(f"{i}\n{_to_srt_timestamp(t)} --> {_to_srt_timestamp(t1)}\n{line}\n\n")
+        t = t1
     with open(out_path, "w", encoding="utf-8") as f:
-        for i, line in enumerate(chunks, start=1):
-            t0 = t
-            t1 = min(total_duration, t + dur)
-            f.write(f"{i}\n{_to_srt_timestamp(t0)} --> {_to_srt_timestamp(t1)}\n{line}\n\n")
-            t = t1
+        f.write("".join(blocks))
 
 def _parse_iso8601(dt: str) -> Optional[datetime]:
     if not dt: 
@@ -432,23 +652,31 @@ def _parse_iso8601(dt: str) -> Optional[datetime]:
         return None
 
 
+# Znaki, których quote() w ścieżce/query nie zmienia (RFC 3986: unreserved + reserved + %).
+_URL_PATH_SAFE_CHARS = "/:@-._~!$&'()*+,;=%"
+_URL_PATH_SAFE_RE = re.compile(r"[A-Za-z0-9/:@\-._~!$&'()*+,;=%]*")
+_URL_QUERY_SAFE_RE = re.compile(r"[A-Za-z0-9/?:@\-._~!$&'()*+,;=%]*")
+
 def _encode_asset_url(u: str) -> str:
     """Zwraca URL z poprawnie zakodowaną ścieżką (bez surowych znaków diakrytycznych)."""
     if not isinstance(u, str) or not u:
         return u
     parts = urlsplit(u)
+    path_ok = _URL_PATH_SAFE_RE.fullmatch(parts.path) is not None
+    query_ok = _URL_QUERY_SAFE_RE.fullmatch(parts.query) is not None
+    if path_ok and query_ok:
+        # typowy URL z CDN – już poprawnie zakodowany
+        return u
     # Zakoduj path zgodnie z RFC 3986 (zachowaj / oraz znaki rezerwowe)
-    safe_chars = "/:@-._~!$&'()*+,;=%"
-    path = quote(parts.path, safe=safe_chars)
+    path = parts.path if path_ok else quote(parts.path, safe=_URL_PATH_SAFE_CHARS)
     # Przepisz query bez zmian semantycznych (zachowanie oryginalnych wartości)
-    if parts.query:
+    if parts.query and not query_ok:
         q = urlencode(parse_qsl(parts.query, keep_blank_values=True), doseq=True)
     else:
-        q = ""
+        q = parts.query
     return urlunsplit((parts.scheme, parts.netloc, path, q, parts.fragment))
 
-def _is_public_http(url: str) -> bool:
-    return isinstance(url, str) and url.startswith(("http://", "https://"))
+_is_public_http = _is_http_url
 
 # [ADD] — usuwanie lokalne z zachowaniem kopii na S3
 def delete_project_local_only(project_id: str, ensure_s3: bool = True) -> bool:
@@ -521,12 +749,11 @@ def scrap_page(url: str, language: str = "pl") -> Dict:
     for m in data.get("media", []):
         mtype = detect_media_type(m.get("src", ""))
         if mtype in ("image", "video"):
-            if len(m["src"].split('.webp')) == 2:
-                m_src = m["src"].split('.webp')[0]
-            elif len(m["src"].split('?')) == 2:
-                m_src = m["src"].split('?')[0]
-            else:
-                m_src = m["src"]
+            m_src = m["src"]
+            if m_src.count('.webp') == 1:
+                m_src = m_src.partition('.webp')[0]
+            elif m_src.count('?') == 1:
+                m_src = m_src.partition('?')[0]
             
             media_items.append({"type": mtype, "src": m_src})
 
@@ -659,35 +886,37 @@ def update_manifest(project_dir: str, patch: Dict) -> Dict:
 
     if manifest is None:
         if os.path.isfile(mpath):
-            with open(mpath, "r", encoding="utf-8") as f:
-                manifest = json.load(f)
+            with open(mpath, "rb") as f:
+                manifest = json_loads(f.read())
             news_to_video_logger.info("[manifest] type=%s, update_manifest: loaded local: %s", type(manifest), mpath)
         else:
             raise FileNotFoundError(f"manifest.json not found in {project_dir}")
 
-    for k, v in (patch or {}).items():
+    if not patch:
+        return manifest
+
+    for k, v in patch.items():
         if isinstance(v, dict) and isinstance(manifest.get(k), dict):
             manifest[k].update(v)
         else:
             manifest[k] = v
 
+    # Jeżeli właśnie skończyliśmy render lub podbito outputs – sync do S3.
+    # s3_synced dopiero po udanym syncu: przerwany sync (restart workera) zostawia
+    # manifest bez flagi, więc api_status ponowi sync.
+    should_sync = (patch.get("status") == "done" or "outputs" in patch) and _s3_ready()
+    if should_sync:
+        manifest.pop("s3_synced", None)
+
     save_json(mpath, manifest)
 
-    # >>> DODAJ — jeżeli właśnie skończyliśmy render lub podbito outputs
-    try:
-        should_sync = (
-            (patch.get("status") == "done") or
-            ("outputs" in (patch or {}))
-        )
-        if should_sync and _s3_ready():
+    if should_sync:
+        try:
             sync_project_to_s3(project_dir)
             manifest["s3_synced"] = True
-            save_json(mpath, manifest)
-    except Exception as e:
-        # opcjonalnie dopisz do manifestu błąd synca
-        manifest["error"] = f"S3 sync error: {e}"
+        except Exception as e:
+            manifest["error"] = f"S3 sync error: {e}"
         save_json(mpath, manifest)
-    # <<< KONIEC DODAWKI
 
     return manifest
 
@@ -719,8 +948,8 @@ def update_manifest_payload(project_dir: str, payload_updates: Dict):
     if manifest is None:
         print(f'\t[update_manifest_payload] manifest nie został odnaleziony na S3')
         if os.path.isfile(mpath):
-            with open(mpath, "r", encoding="utf-8") as f:
-                manifest = json.load(f)
+            with open(mpath, "rb") as f:
+                manifest = json_loads(f.read())
             news_to_video_logger.info(f"[manifest] loaded from local: {mpath}")
         else:
             # 3) Brak manifestu — utwórz minimalny szkielet
@@ -743,26 +972,61 @@ def update_manifest_payload(project_dir: str, payload_updates: Dict):
     save_json(mpath, manifest)
 
 
-def _run(cmd: str) -> Tuple[bool, str]:
-    """Run shell command, return (ok, stderr_out).
+def _ffmpeg_threads_per_invocation(n_workers: int = RENDER_MAX_WORKERS) -> int:
+    """Threads for one ffmpeg process, so N concurrent renders do not oversubscribe the CPU."""
+    env_val = os.getenv("NTV_FFMPEG_THREADS_PER_INVOCATION")
+    if env_val:
+        try:
+            return max(1, min(64, int(env_val)))
+        except ValueError:
+            pass
+    n_workers = max(1, n_workers)
+    return max(1, (os.cpu_count() or n_workers) // n_workers)
+
+
+_FFMPEG_THREADS = str(_ffmpeg_threads_per_invocation())
+
+
+_RUN_PIPE_BUFSIZE = 1 << 20
+
+
+def _run(cmd: Union[str, List[str]], capture_stderr: bool = True,
+         stdin_data: Optional[bytes] = None) -> Tuple[bool, str]:
+    """Run command (argv list, or a string split with shlex; never via a shell), return (ok, stderr_out).
     Transparently replaces leading 'ffmpeg'/'ffprobe' with resolved paths.
+    ffmpeg commands get '-threads N' as an output option (before the output file).
+    stdin_data (if given) is written to the process stdin, e.g. a concat list for '-i -'.
+    stdout is discarded; with capture_stderr=False stderr goes to DEVNULL too
+    and stderr_out is always "".
     """
-    tokens = shlex.split(cmd)
+    tokens = shlex.split(cmd) if isinstance(cmd, str) else [str(t) for t in cmd]
     if tokens:
         if tokens[0] == "ffmpeg":
             tokens[0] = get_ffmpeg_exe()
+            if "-threads" not in tokens and len(tokens) > 1:
+                tokens[-1:-1] = ["-threads", _FFMPEG_THREADS]
         elif tokens[0] == "ffprobe":
             tokens[0] = get_ffprobe_exe()
-    proc = subprocess.run(tokens, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if not capture_stderr:
+        proc = subprocess.run(tokens, input=stdin_data, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if proc.returncode != 0:
+            news_to_video_logger.warning("[_run] exit=%s: %s", proc.returncode, shlex.join(tokens))
+        return proc.returncode == 0, ""
+    # stderr (statystyki ffmpeg) czytany w całości przez communicate(); duży bufor = mniej read()
+    proc = subprocess.run(tokens, input=stdin_data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          bufsize=_RUN_PIPE_BUFSIZE)
     return proc.returncode == 0, proc.stderr.decode("utf-8", "ignore")
 
 
 def _ffprobe_duration(path: str) -> float:
     """Return duration in seconds using ffprobe (resolver-aware)."""
-    cmd = f"ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 {shlex.quote(path)}"
-    tokens = shlex.split(cmd)
-    if tokens and tokens[0] == "ffprobe":
-        tokens[0] = get_ffprobe_exe()
+    tokens = [
+        get_ffprobe_exe(),
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path,
+    ]
     proc = subprocess.run(tokens, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     try:
         return float(proc.stdout.decode().strip())
@@ -770,6 +1034,27 @@ def _ffprobe_duration(path: str) -> float:
         return 0.0
 
 
+def _mp3_duration(path: str) -> float:
+    """Czas MP3 z nagłówków (mutagen, w procesie); ffprobe tylko gdy mutagen niedostępny/nie umie."""
+    if _MutagenMP3 is not None:
+        try:
+            return float(_MutagenMP3(path).info.length)
+        except Exception:
+            pass
+    return _ffprobe_duration(path)
+
+
+_FFMPEG_TIME_RE = re.compile(r"time=(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+def _ffmpeg_out_time(stderr: str) -> float:
+    """Ostatnie 'time=HH:MM:SS.xx' ze statystyk ffmpeg = czas zakodowanego wyjścia (0.0 gdy brak)."""
+    matches = _FFMPEG_TIME_RE.findall(stderr or "")
+    if not matches:
+        return 0.0
+    h, m, sec = matches[-1]
+    return int(h) * 3600 + int(m) * 60 + float(sec)
+
+
 # -----------------------------
 # Pipeline
 # -----------------------------
@@ -873,33 +1158,91 @@ def tts_call(provider: str, text: str, voice_id: str, speed: float, output_path:
     return False
 
 
+# Maks. równoległych zapytań TTS na dostawcę (limity API).
+_TTS_MAX_WORKERS = {"google": 8, "microsoft": 4}
+
+
+# Cisza MP3 bez ffmpeg: ramka MPEG-1 Layer III, 44.1 kHz mono, 32 kbps (104 B), zerowe side info
+# i main data = 1152 próbek ciszy. Parametry jak wcześniejsze anullsrc=r=44100:cl=mono.
+_SILENCE_MP3_FRAME = bytes((0xFF, 0xFB, 0x10, 0xC0)) + bytes(100)
+_SILENCE_MP3_FRAME_SEC = 1152 / 44100
+
+
 def _make_silence_mp3(duration_sec: float, out_path: str) -> bool:
-    # Generate silent MP3 using ffmpeg
+    # Generate silent MP3 by repeating a silent frame (no process spawn)
     dur = max(1.0, float(duration_sec))
-    cmd = (
-        f"ffmpeg -y -f lavfi -i anullsrc=r=44100:cl=mono "
-        f"-t {dur:.3f} -acodec libmp3lame -q:a 4 {shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
-    return ok and os.path.exists(out_path)
+    frames = math.ceil(dur / _SILENCE_MP3_FRAME_SEC)
+    try:
+        with open(out_path, "wb") as f:
+            f.write(_SILENCE_MP3_FRAME * frames)
+    except OSError as e:
+        news_to_video_logger.error("[_make_silence_mp3] write failed %s: %s", out_path, e)
+        return False
+    return True
+
+
+def _mp3_params_uniform(parts: List[str]) -> bool:
+    """True, gdy wszystkie MP3 mają tę samą częstotliwość i liczbę kanałów (wg nagłówków, mutagen)."""
+    if _MutagenMP3 is None:
+        return False
+    seen = set()
+    for p in parts:
+        try:
+            info = _MutagenMP3(p).info
+        except Exception:
+            return False
+        seen.add((info.sample_rate, info.channels))
+        if len(seen) > 1:
+            return False
+    return True
 
 
-def _concat_audio_mp3(parts: List[str], out_path: str) -> bool:
-    # Concat mp3 parts (re-encode to be safe)
+# Demuxer concat czytający listę plików ze stdin (bez pliku alist.txt/vlist.txt na dysku).
+_CONCAT_STDIN_INPUT = ["-f", "concat", "-safe", "0", "-protocol_whitelist", "file,pipe", "-i", "pipe:0"]
+
+
+def _concat_list(parts: List[str]) -> bytes:
+    """Treść listy dla demuxera concat (ścieżki absolutne, apostrofy escapowane)."""
+    lines = []
+    for p in parts:
+        path = os.path.abspath(p).replace("'", "'\\''")
+        lines.append(f"file '{path}'\n")
+    return "".join(lines).encode("utf-8")
+
+
+def _concat_audio_mp3(parts: List[str], out_path: str, copy: Optional[bool] = None) -> bool:
+    """
+    Concat mp3 parts. Strumienie o tych samych parametrach łączone bez rekompresji (-c copy)
+    przez protokół concat: (sklejenie bajtów MP3); copy=None sprawdza to po nagłówkach.
+    Mieszane parametry albo nieudany copy → re-encode przez demuxer concat z listą na stdin.
+    """
     if not parts:
         return False
-    list_path = os.path.join(os.path.dirname(out_path), "alist.txt")
-    with open(list_path, "w", encoding="utf-8") as f:
-        for p in parts:
-            f.write(f"file '{os.path.abspath(p)}'\n")
-    cmd = (
-        f"ffmpeg -y -f concat -safe 0 -i {shlex.quote(list_path)} "
-        f"-acodec libmp3lame -b:a 192k {shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
+    abs_parts = [os.path.abspath(p) for p in parts]
+    if copy is None:
+        copy = _mp3_params_uniform(parts)
+    # '|' jest separatorem protokołu concat: takie ścieżki tylko przez demuxer
+    if copy and not any("|" in p for p in abs_parts):
+        cmd = ["ffmpeg", "-y", "-i", "concat:" + "|".join(abs_parts), "-c", "copy", out_path]
+        ok, _ = _run(cmd, capture_stderr=False)
+        if ok and os.path.exists(out_path):
+            return True
+    cmd = ["ffmpeg", "-y", *_CONCAT_STDIN_INPUT, "-acodec", "libmp3lame", "-b:a", "192k", out_path]
+    ok, _ = _run(cmd, capture_stderr=False, stdin_data=_concat_list(abs_parts))
     return ok and os.path.exists(out_path)
 
 
+def _tts_segment_duration(txt: str, seg_mp3: str, ok: bool, speed: float) -> float:
+    """Czas segmentu TTS; gdy synteza się nie udała, najpierw generuje ciszę o szacowanej długości."""
+    if not ok or not os.path.isfile(seg_mp3):
+        # Fallback: generate silence with estimated duration
+        chars = max(20, len(txt))
+        est_wpm = 160.0 * max(0.5, min(2.0, speed))
+        sec = max(1.2, min(14.0, (chars / 5.0) / (est_wpm / 60.0)))
+        _make_silence_mp3(sec, seg_mp3)
+    return round(_mp3_duration(seg_mp3), 2) or 1.2
+
+
 def synthesize_tts(segments: List[Dict], settings: TTSSettings, out_dir: str) -> Tuple[str, List[Dict]]:
     # print(f'\n\t\tSTART ==> synthesize_tts({type(segments)}, {type(settings)}, {out_dir})')
     """
@@ -907,37 +1250,37 @@ def synthesize_tts(segments: List[Dict], settings: TTSSettings, out_dir: str) ->
     Returns (audio_path, timeline).
     """
     os.makedirs(out_dir, exist_ok=True)
-    timeline: List[Dict] = []
-    cursor = 0.0
-    parts: List[str] = []
 
     news_to_video_logger.info(f'[synthesize_tts] segments len: {len(segments)}')
-    for seg in segments:
-        # print('===>seg<===')
-        seg_id = seg["id"]
-        txt = seg["text"]
-        seg_mp3 = os.path.join(out_dir, f"seg_{seg_id:03d}.mp3")
-
-        ok = tts_call(settings.provider, txt, settings.voice, settings.speed, seg_mp3)
-        if not ok or not os.path.isfile(seg_mp3):
-            # Fallback: generate silence with estimated duration
-            chars = max(20, len(txt))
-            est_wpm = 160.0 * max(0.5, min(2.0, settings.speed))
-            sec = max(1.2, min(14.0, (chars / 5.0) / (est_wpm / 60.0)))
-            _make_silence_mp3(sec, seg_mp3)
-
-        dur_sec = round(_ffprobe_duration(seg_mp3), 2) or 1.2
-        timeline.append({
-            "id": seg_id,
-            "text": txt,
-            "start": round(cursor, 2),
-            "end": round(cursor + dur_sec, 2),
-        })
-        cursor += dur_sec
-        parts.append(seg_mp3)
+    def _one(seg: Dict) -> Tuple[str, float, bool]:
+        # TTS + ewentualna cisza + czas trwania dla jednego segmentu (własne procesy/połączenia)
+        seg_mp3 = os.path.join(out_dir, f"seg_{seg['id']:03d}.mp3")
+        ok = tts_call(settings.provider, seg["text"], settings.voice, settings.speed, seg_mp3)
+        ok = ok and os.path.isfile(seg_mp3)
+        return seg_mp3, _tts_segment_duration(seg["text"], seg_mp3, ok, settings.speed), ok
+
+    # Segmenty równolegle (I/O: sieć providera + ffprobe); map() zwraca wyniki w kolejności segmentów.
+    workers = min(_TTS_MAX_WORKERS.get((settings.provider or "google").lower(), 4), len(segments))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts") as pool:
+            results = list(pool.map(_one, segments))
+    else:
+        results = [_one(seg) for seg in segments]
+
+    # timeline w kolejności segmentów: start = suma czasów poprzednich
+    parts = [seg_mp3 for seg_mp3, _, _ in results]
+    durs = [dur_sec for _, dur_sec, _ in results]
+    starts = itertools.accumulate(durs, initial=0.0)
+    timeline: List[Dict] = [
+        {"id": seg["id"], "text": seg["text"], "start": round(st, 2), "end": round(st + du, 2)}
+        for seg, st, du in zip(segments, starts, durs)
+    ]
 
     out_path = os.path.join(out_dir, "narration.mp3")
-    _concat_audio_mp3(parts, out_path)
+    # Wszystkie części z jednego providera/głosu → te same parametry, concat bez re-encode.
+    # Cisza (fallback) ma własne parametry – wtedy decydują nagłówki albo re-encode.
+    all_synth = all(ok for _, _, ok in results)
+    _concat_audio_mp3(parts, out_path, copy=True if all_synth else None)
 
     print(f'\n\t\tEND ==> synthesize_tts\nreturn:\n out_path: {out_path}\n timeline: {timeline}')
     return out_path, timeline
@@ -954,43 +1297,40 @@ def _build_scale_pad_filter(profile: RenderProfile) -> str:
 
 def _make_image_segment(image_path: str, duration: float, profile: RenderProfile, out_path: str) -> bool:
     vf = _build_scale_pad_filter(profile)
-    cmd = (
-        f"ffmpeg -y -loop 1 -t {duration:.3f} -i {shlex.quote(image_path)} "
-        f"-vf \"{vf},fps={profile.fps}\" -r {profile.fps} "
-        f"-c:v libx264 -pix_fmt yuv420p -b:v {profile.video_bitrate} -an {shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
+    cmd = [
+        "ffmpeg", "-y", "-loop", "1", "-t", f"{duration:.3f}", "-i", image_path,
+        "-vf", f"{vf},fps={profile.fps}", "-r", str(profile.fps),
+        *_segment_x264_args(profile), "-an", out_path,
+    ]
+    ok, _ = _run(cmd, capture_stderr=False)
     return ok and os.path.exists(out_path)
 
 
 def _make_video_segment(video_path: str, start: Optional[float], end: Optional[float],
                         profile: RenderProfile, out_path: str) -> Tuple[bool, float]:
     vf = _build_scale_pad_filter(profile)
-    ss = f"-ss {float(start):.3f} " if start is not None else ""
-    to = ""
+    ss = ["-ss", f"{float(start):.3f}"] if start is not None else []
+    to = []
     if end is not None and start is not None and end > start:
-        to = f"-to {float(end):.3f} "
+        to = ["-to", f"{float(end):.3f}"]
     elif end is not None and start is None:
-        to = f"-to {float(end):.3f} "
-    cmd = (
-        f"ffmpeg -y {ss}{to}-i {shlex.quote(video_path)} "
-        f"-vf \"{vf},fps={profile.fps}\" -r {profile.fps} -an "
-        f"-c:v libx264 -pix_fmt yuv420p -b:v {profile.video_bitrate} {shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
-    dur = _ffprobe_duration(out_path) if ok else 0.0
+        to = ["-to", f"{float(end):.3f}"]
+    cmd = [
+        "ffmpeg", "-y", *ss, *to, "-i", video_path,
+        "-vf", f"{vf},fps={profile.fps}", "-r", str(profile.fps), "-an",
+        *_segment_x264_args(profile), out_path,
+    ]
+    ok, err = _run(cmd)
+    # czas z postępu ffmpeg (bez osobnego ffprobe); ffprobe tylko gdy brak statystyk
+    dur = (_ffmpeg_out_time(err) or _ffprobe_duration(out_path)) if ok else 0.0
     return (ok and os.path.exists(out_path), dur)
 
 
 def _concat_videos(parts: List[str], out_path: str) -> bool:
     if not parts:
         return False
-    list_path = os.path.join(os.path.dirname(out_path), "vlist.txt")
-    with open(list_path, "w", encoding="utf-8") as f:
-        for p in parts:
-            f.write(f"file '{os.path.abspath(p)}'\n")
-    cmd = f"ffmpeg -y -f concat -safe 0 -i {shlex.quote(list_path)} -c copy {shlex.quote(out_path)}"
-    ok, _ = _run(cmd)
+    cmd = ["ffmpeg", "-y", *_CONCAT_STDIN_INPUT, "-c", "copy", out_path]
+    ok, _ = _run(cmd, capture_stderr=False, stdin_data=_concat_list(parts))
     return ok and os.path.exists(out_path)
 
 # funkcje pomocnicze do napisów i brandingu
@@ -999,6 +1339,18 @@ def _escape_sub_path(path: str) -> str:
     return path.replace("\\", "\\\\").replace(":", r"\:").replace("'", r"\'").replace(",", r"\,")
 
 
+def _subtitles_filter(subs_path: str) -> str:
+    """
+    Filtr wypalający napisy. Pliki .ass idą przez filtr 'ass' (libass wprost, bez demuxera
+    napisów i konwersji); inne formaty (.srt) przez 'subtitles'. Opcjonalny fontsdir z configu.
+    """
+    name = "ass" if subs_path.lower().endswith(".ass") else "subtitles"
+    flt = f"{name}='{_escape_sub_path(subs_path)}'"
+    if SUBS_FONTS_DIR:
+        flt += f":fontsdir='{_escape_sub_path(SUBS_FONTS_DIR)}'"
+    return flt
+
+
 # [MODIFY] talk_to/news_to_video/main.py — branding+napisy: zaakceptuj .ass lub .srt (automatycznie wykryj po rozszerzeniu)
 def _apply_branding_and_subtitles(video_in: str, subs_path: Optional[str], branding: Optional[BrandConfig],
                                   profile: RenderProfile, video_out: str) -> bool:
@@ -1009,44 +1361,143 @@ def _apply_branding_and_subtitles(video_in: str, subs_path: Optional[str], brand
     has_subs = bool(subs_path and os.path.isfile(subs_path))
 
     if not has_logo and not has_subs:
-        cmd = f"ffmpeg -y -i {shlex.quote(video_in)} -c copy {shlex.quote(video_out)}"
-        ok, _ = _run(cmd)
+        cmd = ["ffmpeg", "-y", "-i", video_in, "-c", "copy", video_out]
+        ok, _ = _run(cmd, capture_stderr=False)
         return ok and os.path.exists(video_out)
 
     inputs = ["-y", "-i", video_in]
+    logo_prepared = False
+    if has_logo:
+        logo_src, logo_prepared = _logo_input(branding, profile)
+        inputs += ["-i", logo_src]  # HTTP/HTTPS też ok
+    filter_parts, mapsrc = _branding_filter_parts(
+        "[0:v]", "[1:v]" if has_logo else None, branding, subs_path if has_subs else None, profile,
+        logo_prepared=logo_prepared)
+
+    filter_complex = ";".join(filter_parts)
+    cmd = [
+        "ffmpeg", *inputs,
+        "-filter_complex", filter_complex,
+        "-map", mapsrc,
+        *_video_encoder_args(profile, profile.final_preset),
+        "-r", str(profile.fps),
+        "-an", video_out
+    ]
+    ok, _ = _run(cmd, capture_stderr=False)
+    return ok and os.path.exists(video_out)
+
+
+def _prepare_logo(logo_path: str, logo_w: int, opacity: float) -> Optional[str]:
+    """
+    Pobiera logo (lokalne lub HTTP), skaluje do szerokości logo_w i wypieka przezroczystość
+    do PNG RGBA w LOGO_CACHE_DIR. Plik jest kluczowany (źródło, szerokość, krycie), więc kolejne
+    formaty/rendery go reużywają. None, gdy brak Pillow albo logo się nie wczyta.
+    """
+    if Image is None or not logo_path:
+        return None
+    key = hashlib.sha1(f"{logo_path}|{logo_w}|{opacity:.2f}".encode("utf-8")).hexdigest()[:16]
+    out_path = os.path.join(LOGO_CACHE_DIR, f"logo_{key}.png")
+    if os.path.isfile(out_path):
+        return out_path
+    try:
+        if _is_http_url(logo_path):
+            resp = _HTTP.get(logo_path, timeout=20)
+            resp.raise_for_status()
+            src = Image.open(BytesIO(resp.content))
+        else:
+            src = Image.open(logo_path)
+        img = src.convert("RGBA")
+        # przytnij przezroczyste marginesy – overlay obejmuje tylko widoczną część logo
+        bbox = img.getchannel("A").getbbox()
+        if bbox:
+            img = img.crop(bbox)
+        logo_h = max(1, round(img.height * logo_w / img.width))
+        img = img.resize((logo_w, logo_h), Image.LANCZOS)
+        if opacity < 1.0:
+            alpha = img.getchannel("A").point(lambda a: int(a * opacity))
+            img.putalpha(alpha)
+        os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{out_path}.{uuid.uuid4().hex[:6]}.tmp"
+        img.save(tmp_path, format="PNG")
+        os.replace(tmp_path, out_path)
+        return out_path
+    except Exception as e:
+        news_to_video_logger.warning("[_prepare_logo] %s: %s", logo_path, e)
+        return None
+
+
+def _logo_input(branding: BrandConfig, profile: RenderProfile) -> Tuple[str, bool]:
+    """(wejście ffmpeg dla logo, czy już przeskalowane z kryciem)."""
+    logo_w = max(32, int(profile.width * float(branding.scale or 0.15)))
+    prepared = _prepare_logo(branding.logo_path, logo_w, float(branding.opacity or 0.85))
+    return (prepared, True) if prepared else (branding.logo_path, False)
+
+
+def _branding_filter_parts(video_label: str, logo_label: Optional[str], branding: Optional[BrandConfig],
+                           subs_path: Optional[str], profile: RenderProfile,
+                           logo_prepared: bool = False) -> Tuple[List[str], str]:
+    """
+    Łańcuch filtrów logo (overlay) + napisy (ass/subtitles) dla filter_complex.
+    logo_prepared: logo z _prepare_logo – bez scale/colorchannelmixer, tylko overlay.
+    Zwraca (filter_parts, etykieta wyjściowa do -map).
+    """
     filter_parts = []
-    mapsrc = "[0:v]"
+    mapsrc = video_label
 
-    if has_logo:
-        inputs += ["-i", branding.logo_path]  # HTTP/HTTPS też ok
-        logo_w = max(32, int(profile.width * float(branding.scale or 0.15)))
+    if logo_label and branding:
         margin = 24
         pos = (branding.position or "top-right").lower()
         x_expr = f"main_w-w-{margin}" if "right" in pos else f"{margin}"
         y_expr = f"main_h-h-{margin}" if "bottom" in pos else f"{margin}"
-        filter_parts.append(f"[1:v]scale={logo_w}:-1,format=rgba,colorchannelmixer=aa={float(branding.opacity or 0.85):.2f}[lg]")
-        filter_parts.append(f"{mapsrc}[lg]overlay=x={x_expr}:y={y_expr}:format=auto[vlg]")
+        if not logo_prepared:
+            logo_w = max(32, int(profile.width * float(branding.scale or 0.15)))
+            filter_parts.append(f"{logo_label}scale={logo_w}:-1,format=rgba,colorchannelmixer=aa={float(branding.opacity or 0.85):.2f}[lg]")
+            logo_label = "[lg]"
+        # overlay w YUV (główny strumień bez konwersji do RGBA; mieszanie tylko w prostokącie logo)
+        filter_parts.append(f"{mapsrc}{logo_label}overlay=x={x_expr}:y={y_expr}:format=yuv420[vlg]")
         mapsrc = "[vlg]"
 
-    if has_subs:
-        sub_escaped = _escape_sub_path(subs_path)  # type: ignore[arg-type]
-        # ffmpeg automatycznie rozpoznaje ASS/SRT po rozszerzeniu
-        filter_parts.append(f"{mapsrc}subtitles='{sub_escaped}'[vout]")
+    if subs_path:
+        filter_parts.append(f"{mapsrc}{_subtitles_filter(subs_path)}[vout]")
         mapsrc = "[vout]"
 
-    filter_complex = ";".join(filter_parts)
+    return filter_parts, mapsrc
+
+
+def _finalize(video_in: str, audio_path: str, subs_path: Optional[str], branding: Optional[BrandConfig],
+              profile: RenderProfile, out_path: str) -> bool:
+    """
+    Branding + napisy + mux audio w jednym ffmpeg: jedno końcowe kodowanie x264
+    zamiast osobnego pliku z brandingiem i dopiero potem muxu.
+    """
+    has_logo = bool(branding and branding.logo_path)
+    has_subs = bool(subs_path and os.path.isfile(subs_path))
+    if not has_logo and not has_subs:
+        # wejście jest plikiem pośrednim – mux nadal musi być kodowaniem końcowym (bitrate profilu)
+        return _mux_video_audio(video_in, audio_path, profile, out_path,
+                                video_args=_video_encoder_args(profile, profile.final_preset))
+
+    inputs = ["-y", "-i", video_in, "-i", audio_path]
+    logo_prepared = False
+    if has_logo:
+        logo_src, logo_prepared = _logo_input(branding, profile)
+        inputs += ["-i", logo_src]  # HTTP/HTTPS też ok
+    filter_parts, mapsrc = _branding_filter_parts(
+        "[0:v]", "[2:v]" if has_logo else None, branding, subs_path if has_subs else None, profile,
+        logo_prepared=logo_prepared)
+
     cmd = [
         "ffmpeg", *inputs,
-        "-filter_complex", filter_complex,
-        "-map", mapsrc,
-        "-c:v", "libx264", "-preset", "medium", "-pix_fmt", "yuv420p",
-        "-b:v", profile.video_bitrate,
+        "-filter_complex", ";".join(filter_parts),
+        "-map", mapsrc, "-map", "1:a",
+        *_video_encoder_args(profile, profile.final_preset),
         "-r", str(profile.fps),
-        "-an", shlex.quote(video_out)
+        "-c:a", "aac", "-b:a", profile.audio_bitrate,
+        "-movflags", MP4_MOVFLAGS,
+        out_path,
     ]
-    cmd_str = " ".join(str(x) for x in cmd)
-    ok, _ = _run(cmd_str)
-    return ok and os.path.exists(video_out)
+    ok, _ = _run(cmd, capture_stderr=False)
+    return ok and os.path.exists(out_path)
 
 
 
@@ -1061,7 +1512,7 @@ def _apply_branding_and_subtitles_depr(video_in: str, srt_path: Optional[str], b
     # Jeśli brak efektów – skopiuj
     if not has_logo and not has_subs:
         cmd = f"ffmpeg -y -i {shlex.quote(video_in)} -c copy {shlex.quote(video_out)}"
-        ok, _ = _run(cmd)
+        ok, _ = _run(cmd, capture_stderr=False)
         return ok and os.path.exists(video_out)
 
     inputs = ["-y", "-i", video_in]
@@ -1083,8 +1534,7 @@ def _apply_branding_and_subtitles_depr(video_in: str, srt_path: Optional[str], b
         mapsrc = "[vlg]"
 
     if has_subs:
-        sub_escaped = _escape_sub_path(srt_path)  # type: ignore[arg-type]
-        filter_parts.append(f"{mapsrc}subtitles='{sub_escaped}'[vout]")
+        filter_parts.append(f"{mapsrc}{_subtitles_filter(srt_path)}[vout]")  # type: ignore[arg-type]
         mapsrc = "[vout]"
 
     filter_complex = ";".join(filter_parts)
@@ -1099,22 +1549,25 @@ def _apply_branding_and_subtitles_depr(video_in: str, srt_path: Optional[str], b
     ]
     # Ostatni element to ścieżka – jest już zacytowana, połączymy w string:
     cmd_str = " ".join(str(x) for x in cmd)
-    ok, _ = _run(cmd_str)
+    ok, _ = _run(cmd_str, capture_stderr=False)
     return ok and os.path.exists(video_out)
 
 # funkcje pomocnicze xfade concat (przejścia między segmentami)
 def _xfade_concat(paths: List[str], durations: List[float], out_path: str,
                   transition: str = "fade", duration: float = 0.5,
-                  profile: Optional[RenderProfile] = None) -> bool:
+                  profile: Optional[RenderProfile] = None, preset: Optional[str] = None,
+                  intermediate: bool = False) -> bool:
     """
     Łączy N klipów bez audio z wykorzystaniem filtra xfade (crossfade).
+    preset: x264 preset (domyślnie profile.final_preset; profile.preset, gdy wynik idzie dalej do brandingu).
+    intermediate: wynik będzie jeszcze kodowany (branding) – CRF zamiast docelowego bitrate.
     """
     if not paths:
         return False
     if len(paths) == 1:
         # Skopiuj wideo do out_path
-        cmd = f"ffmpeg -y -i {shlex.quote(paths[0])} -c copy {shlex.quote(out_path)}"
-        ok, _ = _run(cmd)
+        cmd = ["ffmpeg", "-y", "-i", paths[0], "-c", "copy", out_path]
+        ok, _ = _run(cmd, capture_stderr=False)
         return ok and os.path.exists(out_path)
 
     profile = profile or RenderProfile()
@@ -1146,13 +1599,11 @@ def _xfade_concat(paths: List[str], durations: List[float], out_path: str,
         "ffmpeg", "-y", *inputs,
         "-filter_complex", filter_complex,
         "-map", last_label,
-        "-c:v", "libx264", "-preset", "medium", "-pix_fmt", "yuv420p",
-        "-b:v", profile.video_bitrate,
+        *_video_encoder_args(profile, preset, intermediate=intermediate),
         "-r", str(profile.fps),
-        "-an", shlex.quote(out_path)
+        "-an", out_path
     ]
-    cmd_str = " ".join(str(x) for x in cmd)
-    ok, _ = _run(cmd_str)
+    ok, _ = _run(cmd, capture_stderr=False)
     return ok and os.path.exists(out_path)
 
 # [ADD] talk_to/news_to_video/main.py — oblicz efektywny czas wizualiów z uwzględnieniem xfade
@@ -1179,8 +1630,7 @@ def prepare_media_segments(media_list: List[MediaItem], audio_duration: float,
     seg_paths: List[str] = []
     durations: List[float] = []
 
-    idx = 1
-    for m in media_list:
+    def _encode_one(idx: int, m: MediaItem) -> Tuple[bool, float, str]:
         seg_out = os.path.join(work_dir, f"seg_{idx:03d}.mp4")
         if m.type == "image":
             ok = _make_image_segment(m.src, default_img_duration, profile, seg_out)
@@ -1191,17 +1641,142 @@ def prepare_media_segments(media_list: List[MediaItem], audio_duration: float,
             ok, dur = _make_video_segment(m.src, start, end, profile, seg_out)
         else:
             ok, dur = False, 0.0
+        return ok, dur, seg_out
 
+    # Niezależne enkody równolegle: budżet wątków ffmpeg na render / _SEGMENT_THREADS na proces.
+    workers = min(len(media_list), max(1, int(_FFMPEG_THREADS) // _SEGMENT_THREADS))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment") as pool:
+            results = list(pool.map(_encode_one, range(1, len(media_list) + 1), media_list))
+    else:
+        results = [_encode_one(i, m) for i, m in enumerate(media_list, start=1)]
+
+    # wyniki w kolejności media_list; nieudane elementy pomijamy
+    for ok, dur, seg_out in results:
         if ok and dur > 0:
             seg_paths.append(seg_out)
             durations.append(dur)
-            idx += 1
 
     total = sum(durations)
     return seg_paths, durations, total
 
 
 
+
+# Jedno wywołanie ffmpeg dla całej ścieżki wizualnej (bez segmentów pośrednich).
+# Powyżej limitu wejść – lub gdy nie da się ustalić czasów – wraca się do prepare_media_segments.
+_SINGLE_PASS_MAX_INPUTS = 48
+
+
+def _plan_single_pass(media_list: List[MediaItem], audio_duration: float,
+                      transitions: TransitionsConfig,
+                      default_img_duration: float) -> Optional[List[Tuple[Optional[MediaItem], float, float]]]:
+    """
+    Plan wejść dla _render_visuals_single_pass: lista (item|None=filler, start, duration).
+    Czasy wideo z ffprobe źródła; dopełnienie do długości audio jak w render_video_local
+    (powtórz ostatni element albo dodaj czarny filler, gdy jest krótszy od przejścia).
+    Zwraca None, gdy czegoś nie da się ustalić z góry.
+    """
+    plan: List[Tuple[Optional[MediaItem], float, float]] = []
+    for m in media_list:
+        if m.type == "image":
+            plan.append((m, 0.0, float(default_img_duration)))
+        elif m.type == "video":
+            src_dur = _ffprobe_duration(m.src)
+            if src_dur <= 0:
+                return None
+            start = float(m.clip.get("start", 0.0)) if m.clip else 0.0
+            end = float(m.clip["end"]) if (m.clip and "end" in m.clip) else src_dur
+            dur = min(end, src_dur) - start
+            if dur <= 0:
+                continue
+            plan.append((m, start, dur))
+    if not plan:
+        return None
+
+    xfade_d = float(transitions.duration)
+    durations = [d for _, _, d in plan]
+    eff = _effective_visual_duration(durations, transitions.use_xfade, xfade_d)
+    safety_iter = 0
+    while eff + 1e-3 < audio_duration and safety_iter < 200:
+        last = plan[-1]
+        if last[2] <= (xfade_d if transitions.use_xfade else 0.0):
+            last = (None, 0.0, max(1.0, (xfade_d or 0.5) + 0.2))
+        plan.append(last)
+        durations.append(last[2])
+        eff = _effective_visual_duration(durations, transitions.use_xfade, xfade_d)
+        safety_iter += 1
+    return plan
+
+
+def _render_visuals_single_pass(media_list: List[MediaItem], audio_duration: float,
+                                profile: RenderProfile, out_path: str,
+                                transitions: Optional[TransitionsConfig] = None,
+                                default_img_duration: float = 4.5,
+                                preset: Optional[str] = None,
+                                intermediate: bool = False) -> Tuple[bool, List[float]]:
+    """
+    Skaluje/paduje wszystkie media w jednym filter_complex i łączy je concat/xfade,
+    kodując wynik raz (zamiast segment → plik → concat). ZWRACA: (ok, durations).
+    Przy ok=False wywołujący powinien użyć ścieżki segmentowej.
+    preset, intermediate: jak w _xfade_concat.
+    """
+    transitions = transitions or TransitionsConfig()
+    plan = _plan_single_pass(media_list, audio_duration, transitions, default_img_duration)
+    if not plan or len(plan) > _SINGLE_PASS_MAX_INPUTS:
+        return False, []
+
+    fps = profile.fps
+    norm = f"{_build_scale_pad_filter(profile)},fps={fps},format=yuv420p,setsar=1,settb=AVTB,setpts=PTS-STARTPTS"
+    inputs: List[str] = []
+    filter_parts: List[str] = []
+    for i, (m, start, dur) in enumerate(plan):
+        if m is None:
+            inputs += ["-f", "lavfi", "-t", f"{dur:.3f}",
+                       "-i", f"color=c=black:s={profile.width}x{profile.height}:r={fps}"]
+        elif m.type == "image":
+            inputs += ["-loop", "1", "-framerate", str(fps), "-t", f"{dur:.3f}", "-i", m.src]
+        else:
+            if start > 0:
+                inputs += ["-ss", f"{start:.3f}"]
+            inputs += ["-t", f"{dur:.3f}", "-i", m.src]
+        filter_parts.append(f"[{i}:v]{norm}[s{i}]")
+
+    durations = [d for _, _, d in plan]
+    if len(plan) == 1:
+        last_label = "[s0]"
+    elif transitions.use_xfade:
+        # ten sam łańcuch offsetów co w _xfade_concat
+        d = float(max(0.1, min(2.0, transitions.duration)))
+        label_prev = "[s0]"
+        offset_acc = 0.0
+        for i in range(1, len(plan)):
+            offset = max(0.0, offset_acc + max(0.0, durations[i-1]) - d)
+            out_label = f"[v{i:02d}]"
+            filter_parts.append(f"{label_prev}[s{i}]xfade=transition={transitions.transition}:"
+                                f"duration={d:.3f}:offset={offset:.3f}{out_label}")
+            label_prev = out_label
+            offset_acc += max(0.0, durations[i-1]) - d
+        last_label = label_prev
+    else:
+        labels = "".join(f"[s{i}]" for i in range(len(plan)))
+        filter_parts.append(f"{labels}concat=n={len(plan)}:v=1:a=0[vout]")
+        last_label = "[vout]"
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    cmd = [
+        "ffmpeg", "-y", *inputs,
+        "-filter_complex", ";".join(filter_parts),
+        "-map", last_label,
+        *_video_encoder_args(profile, preset, intermediate=intermediate),
+        "-r", str(fps),
+        "-an", out_path,
+    ]
+    ok, _ = _run(cmd, capture_stderr=False)
+    ok = ok and os.path.exists(out_path)
+    return ok, (durations if ok else [])
+
+
 def prepare_media_segments_depr(media_list: List[MediaItem], audio_duration: float,
                            profile: RenderProfile, work_dir: str,
                            default_img_duration: float = 4.5) -> Tuple[List[str], float]:
@@ -1246,13 +1821,19 @@ def prepare_media_segments_depr(media_list: List[MediaItem], audio_duration: flo
 
 
 # [MODIFY] talk_to/news_to_video/main.py — MUX: usuń '-shortest', aby nie ucinać audio
-def _mux_video_audio(video_path: str, audio_path: str, profile: RenderProfile, out_path: str) -> bool:
-    cmd = (
-        f"ffmpeg -y -i {shlex.quote(video_path)} -i {shlex.quote(audio_path)} "
-        f"-c:v copy -c:a aac -b:a {profile.audio_bitrate} -movflags +faststart "
-        f"{shlex.quote(out_path)}"
-    )
-    ok, _ = _run(cmd)
+def _mux_video_audio(video_path: str, audio_path: str, profile: RenderProfile, out_path: str,
+                     video_args: Optional[List[str]] = None) -> bool:
+    """
+    Mux wideo + audio. Domyślnie wideo bez rekompresji (-c:v copy); video_args
+    (np. _video_encoder_args) – gdy wejście to plik pośredni i mux jest kodowaniem końcowym.
+    """
+    cmd = [
+        "ffmpeg", "-y", "-i", video_path, "-i", audio_path,
+        *(video_args or ["-c:v", "copy"]),
+        "-c:a", "aac", "-b:a", profile.audio_bitrate, "-movflags", MP4_MOVFLAGS,
+        out_path,
+    ]
+    ok, _ = _run(cmd, capture_stderr=False)
     return ok and os.path.exists(out_path)
 
 
@@ -1262,27 +1843,28 @@ def _mux_video_audio_depr(video_path: str, audio_path: str, profile: RenderProfi
         f"-c:v copy -c:a aac -b:a {profile.audio_bitrate} -shortest -movflags +faststart "
         f"{shlex.quote(out_path)}"
     )
-    ok, _ = _run(cmd)
+    ok, _ = _run(cmd, capture_stderr=False)
     return ok and os.path.exists(out_path)
 
 
 def generate_srt(timeline: List[Dict], out_path: str) -> str:
-    def fmt(ts: float) -> str:
-        ms = int((ts - int(ts)) * 1000)
-        h = int(ts // 3600)
-        m = int((ts % 3600) // 60)
-        s = int(ts % 60)
-        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-    lines = []
-    for i, seg in enumerate(timeline, start=1):
-        lines.append(str(i))
-        lines.append(f"{fmt(seg['start'])} --> {fmt(seg['end'])}")
-        lines.append(seg["text"])
-        lines.append("")
+    body = "\n".join(
+        f"{i}\n{_to_srt_timestamp(seg['start'])} --> {_to_srt_timestamp(seg['end'])}\n{seg['text']}\n"
+        for i, seg in enumerate(timeline, start=1)
+    )
     with open(out_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        f.write(body)
     return out_path
 
+
+def _to_ass_timestamp(t: float) -> str:
+    # H:MM:SS.cc (całkowite setne sekundy – bez przepełnienia cs do 100)
+    total_cs = int(round(max(0.0, t) * 100))
+    s, cs = divmod(total_cs, 100)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return "%d:%02d:%02d.%02d" % (h, m, s, cs)
+
 # [ADD] talk_to/news_to_video/main.py — generator ASS z limitem 5 słów i skalą czcionki do rozdzielczości
 def generate_ass_from_timeline(timeline: List[Dict], profile: RenderProfile, out_path: str,
                                max_words: int = 5, min_chunk_dur: float = 0.7) -> str:
@@ -1291,11 +1873,6 @@ def generate_ass_from_timeline(timeline: List[Dict], profile: RenderProfile, out
     Czas każdego segmentu jest dzielony na porcje równomiernie; jeśli segment za krótki,
     minimalne czasy chunków są zmniejszane, ale liczba słów nadal ≤ max_words.
     """
-    def fmt_ass(ts: float) -> str:
-        h = int(ts // 3600); m = int((ts % 3600) // 60); s = int(ts % 60)
-        cs = int(round((ts - int(ts)) * 100))  # centiseconds
-        return f"{h:01d}:{m:02d}:{s:02d}.{cs:02d}"
-
     fontsize = max(16, int(profile.height * 0.05))  # ~5% wysokości
     margin_v = max(30, int(profile.height * 0.08))
 
@@ -1324,7 +1901,7 @@ def generate_ass_from_timeline(timeline: List[Dict], profile: RenderProfile, out
         if not words:
             continue
 
-        chunk_count = math.ceil(len(words) / max_words)
+        chunk_count = -(-len(words) // max_words)  # ceil w liczbach całkowitych
         # dopasuj minimalny czas chanku, jeśli segment jest krótki
         min_chunk = float(min_chunk_dur)
         if chunk_count * min_chunk > dur:
@@ -1346,11 +1923,11 @@ def generate_ass_from_timeline(timeline: List[Dict], profile: RenderProfile, out
                     cend = end
             # łamanie na dwie linie: 3 + 2 słowa (jeśli >3)
             if len(grp) > 3:
-                split = math.ceil(len(grp) / 2)
+                split = (len(grp) + 1) // 2
                 text = " ".join(grp[:split]) + r"\N" + " ".join(grp[split:])
             else:
                 text = " ".join(grp)
-            lines.append(f"Dialogue: 0,{fmt_ass(cstart)},{fmt_ass(cend)},Default,,0,0,0,,{text}")
+            lines.append(f"Dialogue: 0,{_to_ass_timestamp(cstart)},{_to_ass_timestamp(cend)},Default,,0,0,0,,{text}")
 
     with open(out_path, "w", encoding="utf-8") as f:
         f.write("\n".join(header + lines))
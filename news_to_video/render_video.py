@@ -12,13 +12,14 @@ from pathlib import Path
 
 from news_to_video.config import (
      _ACTIVE_JOBS,
-     _EXECUTOR,
+     get_executor,
      FORMAT_PRESETS, 
      RENDER_MAX_WORKERS
 )
 from news_to_video.renders_engines.s3_proc import (
     load_json,
-    save_json
+    save_json,
+    _s3_upload_many
 )
 from loggers import news_to_video_logger
 from news_to_video.main import (
@@ -31,12 +32,15 @@ from news_to_video.main import (
     generate_ass_from_timeline,
     update_manifest,
     _xfade_concat,
+    _render_visuals_single_pass,
     _concat_videos,
     _run,
     _make_image_segment,
     _ffprobe_duration,
     _apply_branding_and_subtitles,
+    _finalize,
     _mux_video_audio,
+    _video_encoder_args,
     _get_renderer,
     _effective_visual_duration,
     _make_color_segment,
@@ -240,9 +244,24 @@ def render_video_local(project_dir: str, profile: Optional[RenderProfile] = None
         # 4) Media -> segmenty (bez powielania)
         media_items = [MediaItem(**m) for m in payload.get("media", [])]
         seg_dir = os.path.join(project_dir, f"segments_{fmt_key}")
-
-        # news_to_video_logger.info(f"[render_video_local] ===> Prepare media segments ==> prepare_media_segments({media_items}, {audio_duration}, {p}, {seg_dir})")
-        seg_paths, durations, total = prepare_media_segments(media_items, audio_duration, p, seg_dir)
+        visuals_raw = os.path.join(out_dir, f"video_concat_{fmt_key}.mp4")
+
+        # wizualia przed brandingiem/napisami są plikiem pośrednim – szybszy preset x264
+        visuals_intermediate = bool(branding.logo_path or burn_subs)
+        visuals_preset = p.preset if visuals_intermediate else p.final_preset
+
+        # 4a) Szybka ścieżka: jedno ffmpeg (scale/pad + concat/xfade w jednym filter_complex)
+        single_ok, durations = (False, [])
+        if media_items:
+            single_ok, durations = _render_visuals_single_pass(
+                media_items, audio_duration, p, visuals_raw, transitions=transitions,
+                preset=visuals_preset, intermediate=visuals_intermediate)
+        if single_ok:
+            seg_paths = []
+            news_to_video_logger.info(f"[render_video_local] Single-pass visuals -> {visuals_raw} (inputs={len(durations)})")
+        else:
+            # news_to_video_logger.info(f"[render_video_local] ===> Prepare media segments ==> prepare_media_segments({media_items}, {audio_duration}, {p}, {seg_dir})")
+            seg_paths, durations, total = prepare_media_segments(media_items, audio_duration, p, seg_dir)
         
         # news_to_video_logger.info(f"[render_video_local] Segments encoded ==> count: {len(seg_paths)} "
         #                           f"total: {total}s, sumDur: {sum(durations):.2f}s")
@@ -262,8 +281,12 @@ def render_video_local(project_dir: str, profile: Optional[RenderProfile] = None
         news_to_video_logger.info(f"[render_video_local] Effective visual duration (pre-pad)={eff:.2f}s vs audio={audio_duration:.2f}s")
 
 
-        if not seg_paths:
-            visuals_raw = os.path.join(out_dir, f"video_concat_{fmt_key}.mp4")
+        # czy visuals_raw ma już kodowanie końcowe (bitrate profilu); segmenty, filler i concat
+        # '-c copy' to strumień pośredni (ultrafast/CRF) – wtedy kodowanie końcowe robi mux
+        visuals_final = single_ok and not visuals_intermediate
+        if single_ok:
+            pass  # dopełnienie do długości audio i łączenie zrobione w jednym przebiegu
+        elif not seg_paths:
             _make_color_segment(max(1.0, audio_duration or 3.0), p, visuals_raw, color="black")
             news_to_video_logger.info(f"[render_video_local] No visuals; generated filler={visuals_raw}")
 
@@ -306,41 +329,59 @@ def render_video_local(project_dir: str, profile: Optional[RenderProfile] = None
                 news_to_video_logger.info(f'[render_video_local] [{eff + 1e-3} < {audio_duration}] ==> while {eff} + 1e-3 < {audio_duration} and {safety_iter} < 200')
             
 
-            visuals_raw = os.path.join(out_dir, f"video_concat_{fmt_key}.mp4")
             if transitions.use_xfade and len(seg_paths) > 1:
                 _xfade_concat(seg_paths, durations, visuals_raw,
-                              transition=transitions.transition, duration=transitions.duration, profile=p)
+                              transition=transitions.transition, duration=transitions.duration, profile=p,
+                              preset=visuals_preset, intermediate=visuals_intermediate)
+                visuals_final = not visuals_intermediate
                 news_to_video_logger.info(f"[render_video_local] Concatenated with xfade -> {visuals_raw}")
             else:
                 _concat_videos(seg_paths, visuals_raw)
                 news_to_video_logger.info(f"[render_video_local] Concatenated (cut) -> {visuals_raw}")
 
-        # 6) Branding + (opcjonalny) burn-in napisów — użyj ASS (limit 5 słów)
+        print('\n\n\t\t\* * * * * 👍 START make a video from components * * * * * ')
+        print('\t\t\* * * * * 👍 START make a video from components * * * * * ')
+        print('\t\t\* * * * * 👍 START make a video from components * * * * * \n\n')
+        # 6+7) Branding + (opcjonalny) burn-in napisów (ASS, limit 5 słów) + mux audio w jednym kodowaniu
+        #      (bez -shortest; video nie krótsze od audio)
         visuals_fx = visuals_raw
+        mp4_path = os.path.join(out_dir, f"output_{fmt_key}.mp4")
+        finalized = False
         if branding.logo_path or burn_subs:
-            fx_path = os.path.join(out_dir, f"video_visuals_fx_{fmt_key}.mp4")
-            applied = _apply_branding_and_subtitles(
+            finalized = _finalize(
                 visuals_raw,
+                audio_path,
                 ass_path if burn_subs else None,
-                branding if (branding.logo_path or burn_subs) else None,
+                branding,
                 p,
-                fx_path
+                mp4_path
             )
-            if applied:
-                visuals_fx = fx_path
-                news_to_video_logger.info(f"[render_video_local] Branding/subtitles applied -> {fx_path} (burn_in={burn_subs})")
+            if finalized:
+                news_to_video_logger.info(f"[render_video_local] Branding/subtitles + mux in one pass -> {mp4_path} (burn_in={burn_subs})")
             else:
-                news_to_video_logger.warning(
-                    "[render_video_local] Branding/subtitles failed for %s (burn_in=%s); falling back to raw visuals",
-                    fmt_key, burn_subs
+                # zgodność wstecz: osobny plik z brandingiem, potem mux
+                fx_path = os.path.join(out_dir, f"video_visuals_fx_{fmt_key}.mp4")
+                applied = _apply_branding_and_subtitles(
+                    visuals_raw,
+                    ass_path if burn_subs else None,
+                    branding,
+                    p,
+                    fx_path
                 )
+                if applied:
+                    visuals_fx = fx_path
+                    # bez logo i bez pliku napisów _apply_branding_and_subtitles tylko kopiuje strumień
+                    visuals_final = visuals_final or bool(
+                        branding.logo_path or (burn_subs and os.path.isfile(ass_path)))
+                    news_to_video_logger.info(f"[render_video_local] Branding/subtitles applied -> {fx_path} (burn_in={burn_subs})")
+                else:
+                    news_to_video_logger.warning(
+                        "[render_video_local] Branding/subtitles failed for %s (burn_in=%s); falling back to raw visuals",
+                        fmt_key, burn_subs
+                    )
 
-        print('\n\n\t\t\* * * * * 👍 START make a video from components * * * * * ')
-        print('\t\t\* * * * * 👍 START make a video from components * * * * * ')
-        print('\t\t\* * * * * 👍 START make a video from components * * * * * \n\n')
-        # 7) Mux (scalanie klipow) audio (bez -shortest; video nie krótsze od audio)
-        mp4_path = os.path.join(out_dir, f"output_{fmt_key}.mp4")
-        if not _mux_video_audio(visuals_fx, audio_path, p, mp4_path):
+        mux_video_args = None if visuals_final else _video_encoder_args(p, p.final_preset)
+        if not finalized and not _mux_video_audio(visuals_fx, audio_path, p, mp4_path, video_args=mux_video_args):
             msg = f"mux failed for {fmt_key} (expected {mp4_path})"
             news_to_video_logger.error("[render_video_local] %s", msg)
             raise RuntimeError(msg)
@@ -389,6 +430,7 @@ def render_video_local(project_dir: str, profile: Optional[RenderProfile] = None
 
     # Upload captions/audio
     srt_url = ass_url = audio_url = None
+    pending = []  # (local, key, ctype, key_name) – wysyłane równolegle
     for local, ctype, key_name in [(srt_path, "application/x-subrip", "srt_url"),
                                    (ass_path, "text/plain", "ass_url"),
                                    (audio_path, "audio/mpeg", "audio_url")]:
@@ -396,12 +438,14 @@ def render_video_local(project_dir: str, profile: Optional[RenderProfile] = None
         k = _s3_key_for_local(local)
         print(f'[render_video_local] _s3_key_for_local ==> k: {k}\n\t\t{local}, {ctype}, {key_name}')
         if k:
-            u = _s3_upload_file(local, k, content_type=ctype)
-            print(f'[render_video_local] _s3_upload_file ==> u: {u}\n\t\t{local}, {ctype}')
-            if u:
-                if key_name == "srt_url": srt_url = u
-                elif key_name == "ass_url": ass_url = u
-                elif key_name == "audio_url": audio_url = u
+            pending.append((local, k, ctype, key_name))
+    uploaded = _s3_upload_many([(local, k, ctype) for local, k, ctype, _ in pending])
+    for (local, _, ctype, key_name), u in zip(pending, uploaded):
+        print(f'[render_video_local] _s3_upload_file ==> u: {u}\n\t\t{local}, {ctype}')
+        if u:
+            if key_name == "srt_url": srt_url = u
+            elif key_name == "ass_url": ass_url = u
+            elif key_name == "audio_url": audio_url = u
 
     # 8) Manifest
     manifest.setdefault("outputs", {})
@@ -592,7 +636,7 @@ def start_render_async(project_dir: str) -> str:
     # status = m.get('status')
     # news_to_video_logger.info(f'[start_render_async] m.get("status")==>{status}\nmanifest manifest manifest manifest manifest\n{m}')
 
-    fut = _EXECUTOR.submit(_run_render_job, project_dir)
+    fut = get_executor().submit(_run_render_job, project_dir)
     _ACTIVE_JOBS[project_id] = fut
     # news_to_video_logger.info("[start_render_async] queued project_id=%s", project_id)
     return project_id
@@ -3,6 +3,7 @@
 import json
 import os
 from flask import current_app
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional, List, Tuple
 from datetime import datetime, timezone, date
@@ -18,6 +19,11 @@ from news_to_video.config import (
     VID_EXT
 )
 
+# Rozszerzenia bez kropki – dla ?format=/?ext= w detect_media_type.
+_IMG_FORMATS = frozenset(e.strip(".") for e in IMG_EXT)
+_VID_FORMATS = frozenset(e.strip(".") for e in VID_EXT)
+
+@lru_cache(maxsize=4096)
 def detect_media_type(path_or_url: str) -> Optional[str]:
     """
     Rozpoznaje typ pliku (image|video) dla ścieżek lokalnych i URL-i z dodatkowymi parametrami.
@@ -62,9 +68,9 @@ def detect_media_type(path_or_url: str) -> Optional[str]:
         fmt_vals = (params.get("format") or params.get("ext") or [])
         if fmt_vals:
             f = fmt_vals[0].strip(".").lower()
-            if f in {e.strip(".") for e in IMG_EXT}:
+            if f in _IMG_FORMATS:
                 return "image"
-            if f in {e.strip(".") for e in VID_EXT}:
+            if f in _VID_FORMATS:
                 return "video"
         # szybki fallback na tekstowe wystąpienia w query
         q = query.lower()
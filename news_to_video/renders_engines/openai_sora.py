@@ -36,6 +36,7 @@ from news_to_video.main import (
     _apply_branding_and_subtitles,
     BrandConfig,
     _run,
+    _subtitles_filter,
 )
 
 
@@ -508,8 +509,7 @@ def render_via_openai_sora(project_dir: str, profile: Optional[Any] = None) -> D
                     fc_parts.append(f"{mapsrc}[lg]overlay=x={x_expr}:y={y_expr}:format=auto[vlg]")
                     mapsrc = "[vlg]"
                 if subs_path:
-                    from_path = subs_path.replace("\\", "\\\\").replace(":", r"\:").replace("'", r"\'").replace(",", r"\,")
-                    fc_parts.append(f"{mapsrc}subtitles='{from_path}'[vout]")
+                    fc_parts.append(f"{mapsrc}{_subtitles_filter(subs_path)}[vout]")
                     mapsrc = "[vout]"
                 filter_complex = ";".join(fc_parts)
                 branded_with_audio = outputs_dir / f"{video_path.stem}_branded_audio.mp4"
@@ -521,8 +521,7 @@ def render_via_openai_sora(project_dir: str, profile: Optional[Any] = None) -> D
                     "-c:a", "aac", "-b:a", "192k",
                     str(branded_with_audio)
                 ]
-                cmd_str = " ".join(shlex.quote(str(x)) for x in cmd)
-                ok, _ = _run(cmd_str)
+                ok, _ = _run(cmd, capture_stderr=False)
                 if ok and os.path.exists(branded_with_audio):
                     final_video_path = branded_with_audio
                     news_to_video_logger.info("[openai_sora] Branded video (with original audio) -> %s", branded_with_audio)
@@ -24,6 +24,7 @@ manually or on a machine that has OpenShot installed.
 """
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import sys
@@ -31,15 +32,19 @@ import time
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import BinaryIO, Dict, List, Optional, Any, Union
 import traceback
 
 try:
     import openshot  # type: ignore  # libopenshot Python bindings
     _LIB_OPENSHOT = True
 except Exception:
+    openshot = None  # type: ignore
     _LIB_OPENSHOT = False
 
+# moduł złapany przy imporcie – render nie importuje go ponownie
+_openshot_mod = openshot if _LIB_OPENSHOT else None
+
 
 # --------------------------- Public Provider API --------------------------------
 
@@ -150,16 +155,21 @@ def start(config: Dict[str, Any], workdir: str) -> Dict[str, Any]:
         "progress": 0,
         "message": "Rendering via libopenshot",
     })
+    job.open_progress_log()
     try:
         _render_with_libopenshot(job.project_path, export_path, job)
+        job.close_progress_log()
         outs = job.list_outputs()
         state = job.read_state()
-        state.update({"status": "done", "outputs": outs, "message": "Render complete"})
+        state.update({"status": "done", "progress": 100, "outputs": outs, "message": "Render complete"})
         job.write_state(state)
         return state
     except Exception as e:
+        job.close_progress_log()
         state = job.read_state()
         state.update({"status": "error", "error": str(e)})
+        if job._last_pct is not None:
+            state["progress"] = job._last_pct
         job.write_state(state)
         return state
 
@@ -168,6 +178,10 @@ def status(config: Dict[str, Any], workdir: str) -> Dict[str, Any]:
     job = _OpenShotJob.from_config(config, workdir)
     job.ensure_dirs()
     state = job.read_state()
+    if state.get("status") == "rendering":
+        pct = job.read_progress()
+        if pct is not None:
+            state["progress"] = pct
     outputs = job.list_outputs()
     if outputs:
         state.setdefault("outputs", outputs)
@@ -192,6 +206,16 @@ def cancel(config: Dict[str, Any], workdir: str) -> Dict[str, Any]:
 
 # --------------------------- Internal Job Model ---------------------------------
 
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """JSON zakodowany w pamięci, jeden write() do pliku obok i os.replace –
+    czytelnik nigdy nie widzi niepełnego pliku."""
+    buf = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb", buffering=0) as f:
+        f.write(buf)
+    os.replace(tmp, path)
+
+
 @dataclass
 class _OpenShotJob:
     workdir: Path
@@ -199,6 +223,10 @@ class _OpenShotJob:
     project_path: Path
     export: Dict[str, Any] = field(default_factory=dict)
     timeline: Dict[str, Any] = field(default_factory=dict)
+    # ostatni zapisany/odczytany stan – odczyty nie parsują state.json ponownie
+    _state_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+    _last_pct: Optional[int] = field(default=None, init=False, repr=False)
+    _progress_fp: Optional[BinaryIO] = field(default=None, init=False, repr=False)
 
     @classmethod
     def from_config(cls, config: Dict[str, Any], workdir: str) -> "_OpenShotJob":
@@ -217,19 +245,61 @@ class _OpenShotJob:
         return self.workdir / "state.json"
 
     def write_state(self, data: Dict[str, Any]) -> None:
-        with open(self.state_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        _write_json_atomic(self.state_path, data)
+        self._state_cache = dict(data)
 
     def read_state(self) -> Dict[str, Any]:
-        if not self.state_path.exists():
-            return {"status": "unknown", "pid": self.pid}
-        with open(self.state_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if self._state_cache is None:
+            if not self.state_path.exists():
+                return {"status": "unknown", "pid": self.pid}
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self._state_cache = json.load(f)
+        return dict(self._state_cache)
+
+    @property
+    def progress_path(self) -> Path:
+        return self.workdir / "progress.log"
+
+    def open_progress_log(self) -> None:
+        # nowy render = nowy log; state.json dostaje postęp dopiero na końcu joba
+        self._progress_fp = open(self.progress_path, "wb", buffering=64 * 1024)
+        self._last_pct = None
+
+    def close_progress_log(self) -> None:
+        if self._progress_fp is not None:
+            self._progress_fp.close()
+            self._progress_fp = None
+
+    def update_progress(self, pct: int) -> None:
+        """Dopisuje linię NDJSON do progress.log tylko przy zmianie pełnego procentu
+        (callback woła się co klatkę); bez parsowania/przepisywania state.json."""
+        pct = min(100, max(0, int(pct)))
+        if pct == self._last_pct or self._progress_fp is None:
+            return
+        self._last_pct = pct
+        self._progress_fp.write(f'{{"p":{pct},"t":{time.time():.3f}}}\n'.encode("ascii"))
+        # max ~100 linii na render: flush, żeby status() z innego procesu widział postęp
+        self._progress_fp.flush()
+
+    def read_progress(self) -> Optional[int]:
+        """Ostatni postęp z progress.log – czyta tylko ogon pliku (ostatnie 4 KiB)."""
+        try:
+            with open(self.progress_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                tail = f.read()
+        except OSError:
+            return None
+        for line in reversed(tail.splitlines()):
+            try:
+                return int(json.loads(line)["p"])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return None
 
     def generate_osp(self) -> Path:
         osp = _timeline_to_osp(self.timeline, self.export)
-        with open(self.project_path, "w", encoding="utf-8") as f:
-            json.dump(osp, f, ensure_ascii=False, indent=2)
+        _write_json_atomic(self.project_path, osp)
         return self.project_path
 
     def export_output_path(self) -> Path:
@@ -238,9 +308,15 @@ class _OpenShotJob:
 
     def list_outputs(self) -> Dict[str, str]:
         outs: Dict[str, str] = {}
-        for p in sorted(self.workdir.glob("*.mp4")):
-            key = "mp4_{}x{}".format(self.export.get("width", "?"), self.export.get("height", "?"))
-            outs[key] = str(p)
+        try:
+            with os.scandir(self.workdir) as it:
+                names = sorted(e.name for e in it if e.name.endswith(".mp4") and e.is_file())
+        except FileNotFoundError:
+            names = []
+        if names:
+            # jeden klucz na rozdzielczość – jak wcześniej wygrywa ostatni plik wg nazwy
+            key = f"mp4_{self.export.get('width', '?')}x{self.export.get('height', '?')}"
+            outs[key] = os.path.join(self.workdir, names[-1])
         if self.project_path.exists():
             outs["openshot_project"] = str(self.project_path)
         return outs
@@ -277,19 +353,27 @@ def _timeline_to_osp(tl: Dict[str, Any], export: Dict[str, Any]) -> Dict[str, An
         "meta": {"generator": "news-to-video.openshot-provider", "generated_at": int(time.time()), "notes": []},
     }
 
-    file_index = {}
+    # klucze: surowa ścieżka z timeline i ścieżka absolutna → id pliku
+    file_index: Dict[str, str] = {}
+    # id unikalne w obrębie projektu (tylko referencje plik/ścieżka/klip) – licznik zamiast uuid4
+    next_id = itertools.count().__next__
+    cwd = os.getcwd()  # raz, zamiast getcwd() w każdym os.path.abspath
     def add_note(msg: str) -> None: project["meta"]["notes"].append(msg)
     def add_file(path: str) -> str:
-        p = os.path.abspath(path)
-        if p in file_index: return file_index[p]
-        file_id = str(uuid.uuid4())
-        project["files"].append({"id": file_id, "path": p, "media_type": _guess_media_type(p)})
-        file_index[p] = file_id
+        file_id = file_index.get(path)
+        if file_id is not None: return file_id
+        p = os.path.normpath(os.path.join(cwd, path))
+        file_id = file_index.get(p)
+        if file_id is None:
+            file_id = f"f{next_id()}"
+            project["files"].append({"id": file_id, "path": p, "media_type": _guess_media_type(p)})
+            file_index[p] = file_id
+        file_index[path] = file_id
         return file_id
 
     # Map video/image clips
     for t_idx, t in enumerate((tl.get("tracks") or [])):
-        track_id = str(uuid.uuid4())
+        track_id = f"t{next_id()}"
         project["tracks"].append({"id": track_id, "number": t_idx})
         for clip in (t.get("clips") or []):
             path = clip.get("path")
@@ -298,7 +382,7 @@ def _timeline_to_osp(tl: Dict[str, Any], export: Dict[str, Any]) -> Dict[str, An
                     add_note(f"Text clip kept as meta: {clip.get('text')!r} at {clip.get('start')}s")
                 continue
             fid = add_file(path)
-            c_id = str(uuid.uuid4())
+            c_id = f"c{next_id()}"
             c_dict = {
                 "id": c_id, "file_id": fid, "track": track_id,
                 "start": float(clip.get("start", 0.0)),
@@ -313,14 +397,14 @@ def _timeline_to_osp(tl: Dict[str, Any], export: Dict[str, Any]) -> Dict[str, An
 
     # Map audio
     if tl.get("audio"):
-        a_track_id = str(uuid.uuid4())
+        a_track_id = f"t{next_id()}"
         project["tracks"].append({"id": a_track_id, "number": len(project["tracks"])})
         for a in (tl.get("audio") or []):
             apath = a.get("path")
             if not apath: continue
             fid = add_file(apath)
             project["clips"].append({
-                "id": str(uuid.uuid4()), "file_id": fid, "track": a_track_id,
+                "id": f"c{next_id()}", "file_id": fid, "track": a_track_id,
                 "start": float(a.get("start", 0.0)),
                 "end": float(a.get("end", max(0.0, float(a.get("start", 0.0)) + 0.1))),
                 "position": float(a.get("start", 0.0)),
@@ -613,29 +697,35 @@ def _adapt_from_portal_timeline_depr(src: Dict[str, Any], export: Dict[str, Any]
     return project
 
 
+_MEDIA_EXT = {
+    ".mp4": "video", ".mov": "video", ".mkv": "video", ".webm": "video",
+    ".mp3": "audio", ".wav": "audio", ".aac": "audio", ".flac": "audio", ".m4a": "audio",
+    ".jpg": "image", ".jpeg": "image", ".png": "image",
+}
+
 def _guess_media_type(path: str) -> str:
-    ext = os.path.splitext(path.lower())[1]
-    if ext in {".mp4", ".mov", ".mkv", ".webm"}: return "video"
-    if ext in {".mp3", ".wav", ".aac", ".flac", ".m4a"}: return "audio"
-    if ext in {".jpg", ".jpeg", ".png"}: return "image"
-    return "unknown"
+    return _MEDIA_EXT.get(os.path.splitext(path)[1].lower(), "unknown")
 
 
 def _render_with_libopenshot(project_path: Path, export_path: Path, job: _OpenShotJob) -> None:
-    import openshot as oslib  # type: ignore
+    oslib = _openshot_mod
+    if oslib is None:
+        raise RuntimeError("libopenshot is not available")
     with open(project_path, "r", encoding="utf-8") as f:
         project = json.load(f)
     fps_num = int(job.export.get("fps", _DEF_PROFILE["fps_num"]))
     width = int(job.export.get("width", _DEF_PROFILE["width"]))
     height = int(job.export.get("height", _DEF_PROFILE["height"]))
     timeline = oslib.Timeline(width, height, fps_num, 1, oslib.LAYOUT_HD)
-    files_by_id = {f["id"]: f for f in project.get("files", [])}
-    for c in project.get("clips", []):
-        f = files_by_id.get(c.get("file_id"))
-        if not f:
-            continue
-        reader = oslib.FFmpegReader(f.get("path"))
-        clip = oslib.Clip(reader)
+    paths_by_id = {f["id"]: f.get("path") for f in project.get("files", [])}
+    # klipy po czasie startu – Timeline dostaje je w kolejności odtwarzania
+    clips = sorted(
+        (c for c in project.get("clips", []) if c.get("file_id") in paths_by_id),
+        key=lambda c: float(c.get("start", 0.0)),
+    )
+    reader_cls, clip_cls = oslib.FFmpegReader, oslib.Clip
+    for c in clips:
+        clip = clip_cls(reader_cls(paths_by_id[c["file_id"]]))
         start = float(c.get("start", 0.0))
         end = float(c.get("end", start))
         if end < start:
@@ -652,10 +742,7 @@ def _render_with_libopenshot(project_path: Path, export_path: Path, job: _OpenSh
     writer.SetAudioChannels(int(job.export.get("channels", _DEF_PROFILE["channels"])))
     total_frames = int(timeline.Duration() * fps_num)
     def on_progress(frame: int) -> None:
-        pct = int((frame / max(1, total_frames)) * 100)
-        state = job.read_state()
-        state.update({"progress": min(100, max(0, pct))})
-        job.write_state(state)
+        job.update_progress(int((frame / max(1, total_frames)) * 100))
     timeline.Export(writer, on_progress)
 
 
@@ -2,6 +2,8 @@
 import json
 import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
 from flask import current_app
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
@@ -28,6 +30,27 @@ from news_to_video.renders_engines.helpers_proc import (
 )
 
 from loggers import news_to_video_logger
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# orjson: datetime/dataclass przez _json_default – ten sam wynik co json.dump.
+_ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_APPEND_NEWLINE
+) if orjson is not None else 0
+
+
+def json_loads(data):
+    """json.loads przez orjson, gdy jest zainstalowany (bytes lub str)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 from urllib.parse import urlparse
 
 
@@ -41,11 +64,15 @@ def save_json(path: str | os.PathLike, data: dict) -> None:
     path = str(path)
     dname = os.path.dirname(path) or "."
     os.makedirs(dname, exist_ok=True)
-    fd, tmp = tempfile.mkstemp(prefix=".tmp_manifest_", dir=dname, text=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_manifest_", dir=dname, text=orjson is None)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
-            f.write("\n")
+        if orjson is not None:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS))
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
+                f.write("\n")
         os.replace(tmp, path)
     except Exception:
         # w razie błędu usuń plik tymczasowy
@@ -83,9 +110,9 @@ def load_json(path: str | os.PathLike) -> Optional[dict]:
     if not os.path.isfile(path):
         return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        with open(path, "rb") as f:
+            return json_loads(f.read())
+    except ValueError as e:
         try:
             with open(path, "r", encoding="utf-8") as f:
                 preview = f.read(300)
@@ -558,7 +585,7 @@ def _s3_get_json_by_key(s3, bucket: str, key: str) -> Optional[Dict[str, Any]]:
     try:
         obj = s3.get_object(Bucket=bucket, Key=key)
         data = obj["Body"].read()
-        json_data = json.loads(data.decode("utf-8"))
+        json_data = json_loads(data)
         # print(f'\n\t\tEND ==> _s3_get_json_by_key() ==> json_data type={type(json_data)}')
         return json_data
      
@@ -607,6 +634,16 @@ def _s3_env_base_url(bucket: str, region: str) -> str:
         return base.rstrip("/")
     return f"https://{bucket}.s3.{region}.amazonaws.com"
 
+_MB = 1024 * 1024
+# multipart dla dużych plików (MP4): części po 8 MB wysyłane równolegle
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * _MB,
+    multipart_chunksize=8 * _MB,
+    max_concurrency=8,
+    use_threads=True,
+)
+_S3_UPLOAD_WORKERS = 4
+
 # bezpieczny upload do s3 -> _s3_upload_file
 def _s3_upload_file(local_path: str, s3_key: str, content_type: Optional[str] = None) -> Optional[str]:
     news_to_video_logger.info(f'\n\t\tSTART ==> _s3_upload_file(local_path: {local_path}, s3_key: {s3_key}, content_type: {content_type})\n')
@@ -632,7 +669,8 @@ def _s3_upload_file(local_path: str, s3_key: str, content_type: Optional[str] =
             local_path,
             bucket,
             s3_key,
-            ExtraArgs={"ContentType": content_type, "ACL": "public-read"}
+            ExtraArgs={"ContentType": content_type, "ACL": "public-read"},
+            Config=_TRANSFER_CONFIG,
         )
 
         url = f"{base_url}/{s3_key}"
@@ -644,6 +682,16 @@ def _s3_upload_file(local_path: str, s3_key: str, content_type: Optional[str] =
         news_to_video_logger.info("❌ [_s3_upload_file] upload_file ERROR path=%s key=%s err=%s", local_path, s3_key, str(e))
         return None
 
+def _s3_upload_many(items: List[Tuple[str, str, Optional[str]]]) -> List[Optional[str]]:
+    """
+    Równoległy _s3_upload_file dla listy (local_path, s3_key, content_type).
+    Wyniki (URL albo None) w kolejności wejścia; klient S3 współdzielony (thread-safe).
+    """
+    if len(items) <= 1:
+        return [_s3_upload_file(p, k, content_type=c) for p, k, c in items]
+    with ThreadPoolExecutor(max_workers=min(_S3_UPLOAD_WORKERS, len(items)), thread_name_prefix="s3-upload") as pool:
+        return list(pool.map(lambda item: _s3_upload_file(item[0], item[1], content_type=item[2]), items))
+
 def _s3_download_json(abs_path: str) -> Optional[dict]:
     print(f'\n\t\tSTART ==> _s3_download_json({abs_path})')
     """Pobierz JSON z S3 na podstawie ścieżki względem BASE_DIR."""
@@ -658,7 +706,7 @@ def _s3_download_json(abs_path: str) -> Optional[dict]:
         bucket = _s3_env_bucket() or default_bucket
         obj = s3.get_object(Bucket=bucket, Key=key)
         data = obj["Body"].read()
-        return json.loads(data.decode("utf-8"))
+        return json_loads(data)
     except s3.exceptions.NoSuchKey:
         news_to_video_logger.info("[_s3_download_json] manifest not found bucket=%s key=%s", bucket, key)
         return None
@@ -732,13 +780,16 @@ def sync_project_to_s3(project_dir: str) -> bool:
             items.append((outs[k], ctype, urlk))
 
     updated = False
+    pending = []  # (local_path, key, ctype, url_key)
     for local_path, ctype, url_key in items:
         if outs.get(url_key):
             continue  # już jest URL
         key = _s3_key_for_local(local_path)
         if not key:
             continue
-        url = _s3_upload_file(local_path, key, content_type=ctype)
+        pending.append((local_path, key, ctype, url_key))
+    urls = _s3_upload_many([(p, k, c) for p, k, c, _ in pending])
+    for (_, _, _, url_key), url in zip(pending, urls):
         if url:
             outs[url_key] = url
             updated = True
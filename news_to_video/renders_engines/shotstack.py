@@ -18,6 +18,7 @@ from news_to_video.main import (
     _ffprobe_duration,
     _write_srt_by_chunks, 
     _ensure_remote_url,
+    _ensure_remote_urls,
     _encode_asset_url,
     _effective_visual_duration,
     _make_color_segment,
@@ -402,16 +403,18 @@ def render_via_shotstack(project_dir: str, profile: Optional[RenderProfile] = No
             if resolved:
                 gallery_sources.append(resolved)
     else:
+        media_sources: List[str] = []
         for media_item in (payload.get("media") or []):
-            src = media_item.get("src")
+            src = str(media_item.get("src") or "").strip()
             if not src:
                 continue
             media_type = str(media_item.get("type") or "").lower()
             if media_type and media_type not in ("image", "video"):
                 continue
-            resolved = _resolve_asset_url(src)
-            if resolved:
-                gallery_sources.append(resolved)
+            media_sources.append(src)
+        # lokalne pliki → S3 równolegle, kolejność galerii zachowana; nieudane uploady pomijane
+        resolved_sources = _ensure_remote_urls([(src, None) for src in media_sources])
+        gallery_sources.extend(src for src in resolved_sources if src)
     if not gallery_sources and logo_src:
         gallery_sources.append(logo_src)
 
@@ -42,7 +42,7 @@ from news_to_video.renders_engines.s3_proc import (
     s3_media_tree,
     _safe_load_manifest
 )
-from news_to_video.config import BASE_DIR, PROJECTS_DIR, test_data
+from news_to_video.config import BASE_DIR, PROJECTS_DIR, load_test_data
 # Import logiki z render_video.py
 from news_to_video.render_video import (
     rerender_project,
@@ -221,6 +221,7 @@ def create_form():
     print(f'\n\t\tSTART ====> create_form()')
 
     import random
+    test_data = load_test_data()
     klucze = list(test_data.keys())
     # Wylosuj jeden klucz z listy
     losowy_klucz = random.choice(klucze)